@@ -8,31 +8,88 @@ from OnShape models, with real-time control and state monitoring.
 
 import pybullet as p
 import pybullet_data
+from pybullet_utils import bullet_client
 import numpy as np
+import math
 import os
 import time
 from typing import Optional, Dict, List, Tuple, Any
 import json
 from pathlib import Path
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Run the decorated function as plain Python when Numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+# Columns of the state history ring buffer, one row per simulation step
+HISTORY_COLUMNS = (
+    'time', 'motor_angle', 'motor_velocity', 'pendulum_angle',
+    'pendulum_velocity', 'control_torque', 'error'
+)
+TORQUE_COLUMN = 5
+ERROR_COLUMN = 6
+
+# Pendulum counts as upright within this many radians of the target
+UPRIGHT_THRESHOLD = math.radians(10.0)
+_RAD2DEG = 180.0 / math.pi
+METRICS_WINDOW = 100      # Samples used for the performance metrics
+METRICS_MIN_SAMPLES = 10  # Samples required before metrics are reported
+
+# Bullet engine settings for a single contact-light rigid chain; the residual
+# threshold lets the solver stop early once the joints converge, and split
+# impulse keeps penetration recovery out of the velocity solve
+PHYSICS_ENGINE_PARAMS = {
+    'numSubSteps': 1,
+    'enableConeFriction': 0,
+    'deterministicOverlappingPairs': 1,
+    'solverResidualThreshold': 1e-4,
+    'useSplitImpulse': 1,
+    'splitImpulsePenetrationThreshold': -0.02,
+}
+
+# Name fragments identifying the actuated arm joint and the free pendulum joint
+MOTOR_JOINT_KEYWORDS = frozenset({'motor'})
+PENDULUM_JOINT_KEYWORDS = frozenset({'pendulum'})
+
 class OnShapePyBulletSimulation:
     """PyBullet-based rotary inverted pendulum simulation using OnShape models"""
     
-    def __init__(self, urdf_path: Optional[str] = None, gui: bool = False):
+    def __init__(self, urdf_path: Optional[str] = None, gui: bool = False,
+                 solver_iterations: int = 10,
+                 physics_params: Optional[Dict[str, float]] = None):
         self.urdf_path = urdf_path
         self.gui = gui
         self.physics_client = None
+        self._p = None  # Per-instance BulletClient, so several sims can share a process
         self.pendulum_id = None
         
         # Joint indices (will be determined from URDF)
         self.motor_joint_id = None
         self.pendulum_joint_id = None
         self.joint_name_to_id = {}
+        self._joint_ids = []  # [motor, pendulum], for batched state reads
+        self._motor_ids = []  # [motor], for batched torque commands
+        self._saved_state_id = None  # Bullet snapshot of the initial state
         
         # Simulation parameters
         self.dt = 1/240.0  # 240 Hz physics
         self.gravity = -9.81
         self.simulation_time = 0.0
+        self.step_count = 0
+        
+        # A single rigid chain converges well below Bullet's default 50
+        # solver iterations; raise this for contact-rich scenes
+        self.solver_iterations = solver_iterations
+        # Overrides for PHYSICS_ENGINE_PARAMS (any setPhysicsEngineParameter keyword)
+        self.physics_params = {**PHYSICS_ENGINE_PARAMS, **(physics_params or {})}
         
         # State variables
         self.motor_position = 0.0
@@ -45,9 +102,16 @@ class OnShapePyBulletSimulation:
         self.control_enabled = False
         self.target_angle = 0.0  # Target pendulum angle (upright)
         
-        # Data logging
-        self.state_history = []
+        # Debug GUI sliders are polled every N steps (24 steps = 10 Hz)
+        self._slider_poll_every = 24
+        self._slider_counter = 0
+        
+        # Data logging (preallocated ring buffer, see HISTORY_COLUMNS)
         self.max_history = 1000
+        self._history = np.empty((self.max_history, len(HISTORY_COLUMNS)), dtype=np.float64)
+        self._history_index = 0  # Next row to write
+        self._history_count = 0  # Rows written so far, capped at max_history
+        self._reset_window_stats()
         
         # Performance metrics
         self.metrics = {
@@ -56,15 +120,34 @@ class OnShapePyBulletSimulation:
             'control_effort': 0.0,
             'uptime_percentage': 0.0
         }
+        
+        # Reused by step_simulation rather than building a new dict per step
+        self._out = {
+            'success': True,
+            'time': 0.0,
+            'motor_angle': 0.0,
+            'motor_velocity': 0.0,
+            'pendulum_angle': 0.0,
+            'pendulum_velocity': 0.0,
+            'control_torque': 0.0,
+            'control_enabled': False,
+            'target_angle': 0.0,
+            'metrics': self.metrics
+        }
     
     def initialize(self) -> bool:
         """Initialize PyBullet simulation"""
         try:
+            # Re-initializing: release any previous client; its state
+            # snapshot id means nothing on the new one
+            self.close()
+            self._saved_state_id = None
+            
             # Connect to PyBullet
             if self.gui:
-                self.physics_client = p.connect(p.GUI)
-                p.configureDebugVisualizer(p.COV_ENABLE_GUI, 1)
-                p.resetDebugVisualizerCamera(
+                self._p = bullet_client.BulletClient(connection_mode=p.GUI)
+                self._p.configureDebugVisualizer(p.COV_ENABLE_GUI, 1)
+                self._p.resetDebugVisualizerCamera(
                     cameraDistance=0.8,
                     cameraYaw=45,
                     cameraPitch=-20,
@@ -74,19 +157,34 @@ class OnShapePyBulletSimulation:
                 # Add debug sliders for PID tuning
                 self._setup_debug_gui()
             else:
-                self.physics_client = p.connect(p.DIRECT)
+                self._p = bullet_client.BulletClient(connection_mode=p.DIRECT)
+            self.physics_client = self._p._client
             
             # Set up physics
-            p.setAdditionalSearchPath(pybullet_data.getDataPath())
-            p.setGravity(0, 0, self.gravity)
-            p.setTimeStep(self.dt)
-            p.setRealTimeSimulation(0)  # Use stepped simulation
+            self._p.setAdditionalSearchPath(pybullet_data.getDataPath())
+            self._p.setGravity(0, 0, self.gravity)
+            self._p.setTimeStep(self.dt)
+            self._p.setPhysicsEngineParameter(
+                numSolverIterations=self.solver_iterations,
+                **self.physics_params
+            )
+            self._p.setRealTimeSimulation(0)  # Use stepped simulation
+            
+            # Pause rendering while bodies are loaded so the GUI doesn't
+            # redraw after every shape
+            if self.gui:
+                self._p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 0)
             
             # Load environment
             self._load_environment()
             
             # Load pendulum model
-            if not self._load_pendulum_model():
+            loaded = self._load_pendulum_model()
+            
+            if self.gui:
+                self._p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 1)
+            
+            if not loaded:
                 return False
             
             # Set initial conditions
@@ -101,19 +199,19 @@ class OnShapePyBulletSimulation:
     
     def _setup_debug_gui(self):
         """Setup debug GUI for PID tuning"""
-        self.debug_kp = p.addUserDebugParameter("Kp", 0, 50, self.pid_controller.kp)
-        self.debug_ki = p.addUserDebugParameter("Ki", 0, 5, self.pid_controller.ki)
-        self.debug_kd = p.addUserDebugParameter("Kd", 0, 10, self.pid_controller.kd)
-        self.debug_target = p.addUserDebugParameter("Target Angle", -0.5, 0.5, 0.0)
+        self.debug_kp = self._p.addUserDebugParameter("Kp", 0, 50, self.pid_controller.kp)
+        self.debug_ki = self._p.addUserDebugParameter("Ki", 0, 5, self.pid_controller.ki)
+        self.debug_kd = self._p.addUserDebugParameter("Kd", 0, 10, self.pid_controller.kd)
+        self.debug_target = self._p.addUserDebugParameter("Target Angle", -0.5, 0.5, 0.0)
     
     def _load_environment(self):
         """Load environment (ground plane, lighting, etc.)"""
         # Load ground plane
-        p.loadURDF("plane.urdf", basePosition=[0, 0, -0.1])
+        self._p.loadURDF("plane.urdf", basePosition=[0, 0, -0.1])
         
         # Add lighting for better visualization
         if self.gui:
-            p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
+            self._p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
     
     def _load_pendulum_model(self) -> bool:
         """Load the pendulum model from URDF"""
@@ -121,7 +219,7 @@ class OnShapePyBulletSimulation:
             if self.urdf_path and os.path.exists(self.urdf_path):
                 print(f"📁 Loading URDF: {self.urdf_path}")
                 
-                self.pendulum_id = p.loadURDF(
+                self.pendulum_id = self._p.loadURDF(
                     self.urdf_path, 
                     basePosition=[0, 0, 0],
                     baseOrientation=[0, 0, 0, 1],
@@ -132,7 +230,7 @@ class OnShapePyBulletSimulation:
                 # Get joint information
                 self._analyze_joints()
                 
-                print(f"✅ Loaded OnShape model with {p.getNumJoints(self.pendulum_id)} joints")
+                print(f"✅ Loaded OnShape model with {self._p.getNumJoints(self.pendulum_id)} joints")
                 
             else:
                 print("⚠️  URDF not found, creating simple model")
@@ -149,21 +247,19 @@ class OnShapePyBulletSimulation:
         if self.pendulum_id is None:
             return
         
-        num_joints = p.getNumJoints(self.pendulum_id)
+        num_joints = self._p.getNumJoints(self.pendulum_id)
         
-        for joint_id in range(num_joints):
-            joint_info = p.getJointInfo(self.pendulum_id, joint_id)
-            joint_name = joint_info[1].decode('utf-8')
-            joint_type = joint_info[2]
-            
-            self.joint_name_to_id[joint_name] = joint_id
-            
-            print(f"🔗 Joint {joint_id}: {joint_name} (type: {joint_type})")
+        joint_infos = [self._p.getJointInfo(self.pendulum_id, joint_id) for joint_id in range(num_joints)]
+        self.joint_name_to_id = {info[1].decode('utf-8'): info[0] for info in joint_infos}
+        
+        for joint_name, joint_id in self.joint_name_to_id.items():
+            print(f"🔗 Joint {joint_id}: {joint_name} (type: {joint_infos[joint_id][2]})")
             
             # Identify motor and pendulum joints
-            if 'motor' in joint_name.lower():
+            name_lower = joint_name.lower()
+            if any(keyword in name_lower for keyword in MOTOR_JOINT_KEYWORDS):
                 self.motor_joint_id = joint_id
-            elif 'pendulum' in joint_name.lower():
+            elif any(keyword in name_lower for keyword in PENDULUM_JOINT_KEYWORDS):
                 self.pendulum_joint_id = joint_id
         
         # Fallback if names don't match
@@ -171,23 +267,26 @@ class OnShapePyBulletSimulation:
             self.motor_joint_id = 0
         if self.pendulum_joint_id is None:
             self.pendulum_joint_id = 1 if num_joints > 1 else 0
+        
+        self._joint_ids = [self.motor_joint_id, self.pendulum_joint_id]
+        self._motor_ids = [self.motor_joint_id]
     
     def _create_simple_pendulum(self):
         """Create a simple pendulum model using basic shapes (fallback)"""
         # This is a fallback if URDF loading fails
-        base_collision = p.createCollisionShape(p.GEOM_CYLINDER, radius=0.05, height=0.1)
-        base_visual = p.createVisualShape(p.GEOM_CYLINDER, radius=0.05, height=0.1, 
-                                         rgbaColor=[0.2, 0.2, 0.2, 1])
-        
-        arm_collision = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.075, 0.01, 0.01])
-        arm_visual = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.075, 0.01, 0.01],
-                                        rgbaColor=[0.8, 0.8, 0.8, 1])
-        
-        pend_collision = p.createCollisionShape(p.GEOM_CYLINDER, radius=0.005, height=0.2)
-        pend_visual = p.createVisualShape(p.GEOM_CYLINDER, radius=0.005, height=0.2,
-                                         rgbaColor=[1.0, 0.2, 0.2, 1])
+        arm_collision = self._p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.075, 0.01, 0.01])
+        pend_collision = self._p.createCollisionShape(p.GEOM_CYLINDER, radius=0.005, height=0.2)
         
-        self.pendulum_id = p.createMultiBody(
+        # Visual shapes are only needed when something draws them
+        if self.gui:
+            arm_visual = self._p.createVisualShape(p.GEOM_BOX, halfExtents=[0.075, 0.01, 0.01],
+                                                   rgbaColor=[0.8, 0.8, 0.8, 1])
+            pend_visual = self._p.createVisualShape(p.GEOM_CYLINDER, radius=0.005, length=0.2,
+                                                    rgbaColor=[1.0, 0.2, 0.2, 1])
+        else:
+            arm_visual = pend_visual = -1
+        
+        self.pendulum_id = self._p.createMultiBody(
             baseMass=0.1,
             baseCollisionShapeIndex=arm_collision,
             baseVisualShapeIndex=arm_visual,
@@ -206,38 +305,80 @@ class OnShapePyBulletSimulation:
         
         self.motor_joint_id = 0
         self.pendulum_joint_id = 0
+        self._joint_ids = [self.motor_joint_id, self.pendulum_joint_id]
+        self._motor_ids = [self.motor_joint_id]
+    
+    def _rebuild_window_stats(self):
+        """Recompute the running window sums from the history buffer"""
+        recent_history = self._recent_history(METRICS_WINDOW)
+        abs_errors = np.abs(recent_history[:, ERROR_COLUMN])
+        
+        self._sqerr_sum = float(np.dot(abs_errors, abs_errors))
+        self._torque_abs_sum = float(np.abs(recent_history[:, TORQUE_COLUMN]).sum())
+        self._upright_count = int(np.count_nonzero(abs_errors < UPRIGHT_THRESHOLD))
+        self._max_abs_error = float(abs_errors.max()) if len(abs_errors) else 0.0
+        self._max_abs_error_stale = False
     
     def _set_initial_state(self):
         """Set initial joint positions and velocities"""
         if self.pendulum_id is None:
             return
         
-        # Set motor joint to 0
-        if self.motor_joint_id is not None:
-            p.resetJointState(self.pendulum_id, self.motor_joint_id, 0.0)
-        
-        # Set pendulum slightly off vertical (small perturbation)
-        if self.pendulum_joint_id is not None:
-            p.resetJointState(self.pendulum_id, self.pendulum_joint_id, 0.1)
+        if self._saved_state_id is not None:
+            # Later resets restore the snapshot in a single call
+            self._p.restoreState(stateId=self._saved_state_id)
+        else:
+            # Set motor joint to 0
+            if self.motor_joint_id is not None:
+                self._p.resetJointState(self.pendulum_id, self.motor_joint_id, 0.0)
+            
+            # Set pendulum slightly off vertical (small perturbation)
+            if self.pendulum_joint_id is not None:
+                self._p.resetJointState(self.pendulum_id, self.pendulum_joint_id, 0.1)
+            
+            self._saved_state_id = self._p.saveState()
         
         # Reset controller
         self.pid_controller.reset()
         self.simulation_time = 0.0
-        self.state_history.clear()
+        self.step_count = 0
+        self._history_index = 0
+        self._history_count = 0
+        self._reset_window_stats()
+    
+    def _reset_window_stats(self):
+        """Clear the running sums over the last METRICS_WINDOW samples"""
+        self._sqerr_sum = 0.0
+        self._torque_abs_sum = 0.0
+        self._upright_count = 0
+        self._max_abs_error = 0.0
+        self._max_abs_error_stale = False
     
-    def step_simulation(self, duration: float = None) -> Dict[str, Any]:
+    def step_simulation(self, duration: float = None, substeps: int = 1,
+                        log_interval: int = 1) -> Dict[str, Any]:
         """
         Step the simulation and return current state
         
+        The returned dict is reused and overwritten on the next call; copy it
+        if it needs to outlive the step.
+        
         Args:
             duration: If provided, run for this many seconds
+            substeps: Physics ticks to advance per call; the control torque is
+                held across them, so PID runs every dt * substeps seconds and
+                state is logged once per call
+            log_interval: Refresh the returned metrics only every this many
+                calls (0 or 1 refreshes every call); use it when metrics are
+                only read for periodic logging
         """
         if self.pendulum_id is None:
             return {'error': 'Simulation not initialized'}
         
         # Update PID gains from debug GUI if available
         if self.gui and hasattr(self, 'debug_kp'):
-            self._update_debug_parameters()
+            self._slider_counter += 1
+            if self._slider_counter % self._slider_poll_every == 0:
+                self._update_debug_parameters()
         
         # Get current state
         current_state = self._get_current_state()
@@ -245,111 +386,221 @@ class OnShapePyBulletSimulation:
         # Apply control if enabled
         control_torque = 0.0
         if self.control_enabled:
-            control_torque = self._apply_control(current_state)
+            control_torque = self._apply_control(current_state, self.dt * substeps)
         
         # Step physics
-        p.stepSimulation()
-        self.simulation_time += self.dt
+        for _ in range(substeps):
+            self._p.stepSimulation()
+        self.simulation_time += self.dt * substeps
+        self.step_count += 1
         
         # Log state
         self._log_state(current_state, control_torque)
         
         # Calculate metrics
-        self._update_metrics()
+        if log_interval <= 1 or self.step_count % log_interval == 0:
+            self._update_metrics()
         
         # Prepare return data
-        return {
-            'success': True,
-            'time': self.simulation_time,
-            'motor_angle': np.degrees(current_state['motor_position']),
-            'motor_velocity': np.degrees(current_state['motor_velocity']),
-            'pendulum_angle': np.degrees(current_state['pendulum_angle']),
-            'pendulum_velocity': np.degrees(current_state['pendulum_velocity']),
-            'control_torque': control_torque,
-            'control_enabled': self.control_enabled,
-            'target_angle': np.degrees(self.target_angle),
-            'metrics': self.metrics.copy()
-        }
+        return self._write_output(
+            current_state['motor_position'], current_state['motor_velocity'],
+            current_state['pendulum_angle'], current_state['pendulum_velocity'],
+            control_torque
+        )
+    
+    def run(self, n_steps: int) -> Dict[str, Any]:
+        """
+        Advance the simulation n_steps physics ticks in one tight loop
+        
+        Equivalent to calling step_simulation() n_steps times, but without
+        per-step dict building or metric updates; metrics are computed once
+        at the end. PID gains and target are read once up front, so debug
+        GUI sliders are not polled during the rollout. Returns the same
+        (reused) dict as step_simulation for the final step.
+        """
+        if self.pendulum_id is None:
+            return {'error': 'Simulation not initialized'}
+        if n_steps <= 0:
+            return self._out
+        
+        # Bind everything the loop touches to locals
+        get_joint_states = self._p.getJointStates
+        set_motor_control = self._p.setJointMotorControlArray
+        step = self._p.stepSimulation
+        body_id = self.pendulum_id
+        joint_ids = self._joint_ids
+        motor_ids = self._motor_ids
+        torque_control = p.TORQUE_CONTROL
+        history = self._history
+        max_history = self.max_history
+        index = self._history_index
+        dt = self.dt
+        t = self.simulation_time
+        target = self.target_angle
+        control_enabled = self.control_enabled
+        pid = self.pid_controller
+        kp, ki, kd, max_integral = pid.kp, pid.ki, pid.kd, pid.max_integral
+        integral, previous_error = pid.integral, pid.previous_error
+        
+        control_torque = 0.0
+        for _ in range(n_steps):
+            (motor_position, motor_velocity, _, _), (pendulum_angle, pendulum_velocity, _, _) = \
+                get_joint_states(body_id, joint_ids)
+            error = target - pendulum_angle
+            
+            if control_enabled:
+                control_torque, integral = _pid_kernel(
+                    kp, ki, kd, integral, previous_error, max_integral, error, dt
+                )
+                previous_error = error
+                set_motor_control(body_id, motor_ids, torque_control, forces=[control_torque])
+            
+            step()
+            t += dt
+            
+            history[index] = (t, motor_position, motor_velocity, pendulum_angle,
+                              pendulum_velocity, control_torque, error)
+            index += 1
+            if index == max_history:
+                index = 0
+        
+        # Write loop state back
+        pid.integral, pid.previous_error = integral, previous_error
+        self.simulation_time = t
+        self.step_count += n_steps
+        self._history_index = index
+        self._history_count = min(self._history_count + n_steps, max_history)
+        self._rebuild_window_stats()
+        self._update_metrics()
+        
+        return self._write_output(motor_position, motor_velocity, pendulum_angle,
+                                  pendulum_velocity, control_torque)
+    
+    def _write_output(self, motor_position: float, motor_velocity: float,
+                      pendulum_angle: float, pendulum_velocity: float,
+                      control_torque: float) -> Dict[str, Any]:
+        """Fill the reused step output dict (angles in degrees)"""
+        out = self._out
+        out['time'] = self.simulation_time
+        out['motor_angle'] = motor_position * _RAD2DEG
+        out['motor_velocity'] = motor_velocity * _RAD2DEG
+        out['pendulum_angle'] = pendulum_angle * _RAD2DEG
+        out['pendulum_velocity'] = pendulum_velocity * _RAD2DEG
+        out['control_torque'] = control_torque
+        out['control_enabled'] = self.control_enabled
+        out['target_angle'] = self.target_angle * _RAD2DEG
+        return out
     
     def _get_current_state(self) -> Dict[str, float]:
         """Get current joint states"""
-        motor_state = p.getJointState(self.pendulum_id, self.motor_joint_id)
-        pendulum_state = p.getJointState(self.pendulum_id, self.pendulum_joint_id)
+        # Read both joints in a single PyBullet call
+        (motor_position, motor_velocity, _, _), (pendulum_angle, pendulum_velocity, _, _) = \
+            self._p.getJointStates(self.pendulum_id, self._joint_ids)
         
         return {
-            'motor_position': motor_state[0],
-            'motor_velocity': motor_state[1],
-            'pendulum_angle': pendulum_state[0],
-            'pendulum_velocity': pendulum_state[1]
+            'motor_position': motor_position,
+            'motor_velocity': motor_velocity,
+            'pendulum_angle': pendulum_angle,
+            'pendulum_velocity': pendulum_velocity
         }
     
-    def _apply_control(self, state: Dict[str, float]) -> float:
+    def _apply_control(self, state: Dict[str, float], dt: float) -> float:
         """Apply PID control to balance the pendulum"""
         # Error is difference between target and current pendulum angle
         error = self.target_angle - state['pendulum_angle']
         
         # Calculate control output
-        control_output = self.pid_controller.update(error, self.dt)
+        control_output = self.pid_controller.update(error, dt)
         
         # Apply torque to motor joint
         if self.motor_joint_id is not None:
-            p.setJointMotorControl2(
+            self._p.setJointMotorControlArray(
                 self.pendulum_id,
-                self.motor_joint_id,
+                self._motor_ids,
                 p.TORQUE_CONTROL,
-                force=control_output
+                forces=[control_output]
             )
         
         return control_output
     
     def _update_debug_parameters(self):
         """Update PID parameters from debug GUI"""
-        kp = p.readUserDebugParameter(self.debug_kp)
-        ki = p.readUserDebugParameter(self.debug_ki)
-        kd = p.readUserDebugParameter(self.debug_kd)
-        self.target_angle = p.readUserDebugParameter(self.debug_target)
+        kp = self._p.readUserDebugParameter(self.debug_kp)
+        ki = self._p.readUserDebugParameter(self.debug_ki)
+        kd = self._p.readUserDebugParameter(self.debug_kd)
+        self.target_angle = self._p.readUserDebugParameter(self.debug_target)
         
         self.pid_controller.set_gains(kp, ki, kd)
     
     def _log_state(self, state: Dict[str, float], control_torque: float):
         """Log current state for analysis"""
-        log_entry = {
-            'time': self.simulation_time,
-            'motor_angle': state['motor_position'],
-            'motor_velocity': state['motor_velocity'],
-            'pendulum_angle': state['pendulum_angle'],
-            'pendulum_velocity': state['pendulum_velocity'],
-            'control_torque': control_torque,
-            'error': self.target_angle - state['pendulum_angle']
-        }
+        error = self.target_angle - state['pendulum_angle']
+        abs_error = abs(error)
+        
+        # Drop the sample leaving the metrics window from the running sums
+        if self._history_count >= METRICS_WINDOW:
+            old_row = self._history[(self._history_index - METRICS_WINDOW) % self.max_history]
+            old_abs_error = abs(old_row[ERROR_COLUMN])
+            self._sqerr_sum -= old_abs_error * old_abs_error
+            self._torque_abs_sum -= abs(old_row[TORQUE_COLUMN])
+            self._upright_count -= int(old_abs_error < UPRIGHT_THRESHOLD)
+            if old_abs_error >= self._max_abs_error:
+                self._max_abs_error_stale = True
+        
+        self._sqerr_sum += abs_error * abs_error
+        self._torque_abs_sum += abs(control_torque)
+        self._upright_count += int(abs_error < UPRIGHT_THRESHOLD)
+        if abs_error > self._max_abs_error:
+            self._max_abs_error = abs_error
+        
+        # Overwrite the oldest row once the buffer is full
+        self._history[self._history_index] = (
+            self.simulation_time,
+            state['motor_position'],
+            state['motor_velocity'],
+            state['pendulum_angle'],
+            state['pendulum_velocity'],
+            control_torque,
+            error
+        )
         
-        self.state_history.append(log_entry)
+        self._history_index = (self._history_index + 1) % self.max_history
+        self._history_count = min(self._history_count + 1, self.max_history)
+    
+    def _recent_history(self, count: int) -> np.ndarray:
+        """Return the last `count` logged rows in chronological order"""
+        count = min(count, self._history_count)
+        start = self._history_index - count
         
-        # Limit history size
-        if len(self.state_history) > self.max_history:
-            self.state_history.pop(0)
+        if start >= 0:
+            return self._history[start:self._history_index]
+        
+        # Window wraps around the end of the buffer
+        return np.concatenate((self._history[start:], self._history[:self._history_index]))
     
     def _update_metrics(self):
         """Update performance metrics"""
-        if len(self.state_history) < 10:
+        if self._history_count < METRICS_MIN_SAMPLES:
             return
         
-        recent_history = self.state_history[-100:]  # Last 100 samples
+        # Running sums are maintained by _log_state
+        n = min(self._history_count, METRICS_WINDOW)
         
-        # RMS error
-        errors = [abs(entry['error']) for entry in recent_history]
-        self.metrics['rms_error'] = np.sqrt(np.mean(np.square(errors)))
+        # RMS error (clamped: subtracting departed samples can leave -0.0)
+        self.metrics['rms_error'] = math.sqrt(max(self._sqerr_sum, 0.0) / n)
         
-        # Max deviation
-        self.metrics['max_deviation'] = max(errors)
+        # Max deviation, rescanned only after the previous maximum left the window
+        if self._max_abs_error_stale:
+            recent_errors = self._recent_history(METRICS_WINDOW)[:, ERROR_COLUMN]
+            self._max_abs_error = float(np.abs(recent_errors).max())
+            self._max_abs_error_stale = False
+        self.metrics['max_deviation'] = self._max_abs_error
         
         # Control effort
-        torques = [abs(entry['control_torque']) for entry in recent_history]
-        self.metrics['control_effort'] = np.mean(torques)
+        self.metrics['control_effort'] = self._torque_abs_sum / n
         
         # Uptime percentage (percentage of time pendulum is within 10 degrees of upright)
-        upright_count = sum(1 for error in errors if error < np.radians(10))
-        self.metrics['uptime_percentage'] = (upright_count / len(errors)) * 100
+        self.metrics['uptime_percentage'] = self._upright_count / n * 100
     
     def set_pid_gains(self, kp: float, ki: float, kd: float):
         """Set PID controller gains"""
@@ -365,34 +616,63 @@ class OnShapePyBulletSimulation:
         self.control_enabled = False
         # Set motor torque to 0
         if self.pendulum_id and self.motor_joint_id is not None:
-            p.setJointMotorControl2(
+            self._p.setJointMotorControlArray(
                 self.pendulum_id,
-                self.motor_joint_id,
+                self._motor_ids,
                 p.TORQUE_CONTROL,
-                force=0
+                forces=[0.0]
             )
     
     def reset_simulation(self):
         """Reset simulation to initial state"""
         self._set_initial_state()
-        self.metrics = {
-            'rms_error': 0.0,
-            'max_deviation': 0.0,
-            'control_effort': 0.0,
-            'uptime_percentage': 0.0
-        }
+        # Cleared in place: step_simulation's output dict holds a reference
+        self.metrics.update(rms_error=0.0, max_deviation=0.0,
+                            control_effort=0.0, uptime_percentage=0.0)
+    
+    def get_state_array(self) -> np.ndarray:
+        """
+        Get the state history as an (n, len(HISTORY_COLUMNS)) array, oldest first
+        
+        Until the ring buffer wraps this is a read-only view of the live
+        buffer, so no copy is made; after that the two halves are joined
+        into a new array.
+        """
+        history = self._recent_history(self._history_count)
+        if history.base is self._history:
+            history.flags.writeable = False
+        return history
     
     def get_state_history(self) -> List[Dict]:
         """Get the complete state history"""
-        return self.state_history.copy()
+        return [dict(zip(HISTORY_COLUMNS, row)) for row in self.get_state_array().tolist()]
     
     def close(self):
         """Close PyBullet simulation"""
         if self.physics_client is not None:
-            p.disconnect(self.physics_client)
+            self._p.disconnect()
+            self._p = None
+            self._saved_state_id = None
             self.physics_client = None
 
 
+@njit(cache=True, fastmath=True)
+def _pid_kernel(kp: float, ki: float, kd: float, integral: float, previous_error: float,
+                max_integral: float, error: float, dt: float) -> Tuple[float, float]:
+    """One PID step; returns (control output, updated integral)"""
+    # Integral term with anti-windup
+    integral += error * dt
+    if integral > max_integral:
+        integral = max_integral
+    elif integral < -max_integral:
+        integral = -max_integral
+    
+    # Derivative term
+    derivative = (error - previous_error) / dt
+    
+    return kp * error + ki * integral + kd * derivative, integral
+
+
 class PIDController:
     """PID Controller for pendulum balancing"""
     
@@ -407,21 +687,15 @@ class PIDController:
     
     def update(self, error: float, dt: float) -> float:
         """Update PID controller and return control output"""
-        # Proportional term
-        proportional = self.kp * error
-        
-        # Integral term with anti-windup
-        self.integral += error * dt
-        self.integral = np.clip(self.integral, -self.max_integral, self.max_integral)
-        integral = self.ki * self.integral
-        
-        # Derivative term
-        derivative = self.kd * (error - self.previous_error) / dt
+        output, self.integral = _pid_kernel(
+            self.kp, self.ki, self.kd, self.integral, self.previous_error,
+            self.max_integral, error, dt
+        )
         
         # Store error for next iteration
         self.previous_error = error
         
-        return proportional + integral + derivative
+        return output
     
     def set_gains(self, kp: float, ki: float, kd: float):
         """Set PID gains"""
@@ -448,14 +722,15 @@ if __name__ == "__main__":
         print("✅ Simulation initialized")
         sim.enable_control()
         
-        # Run simulation for 10 seconds
-        for i in range(2400):  # 10 seconds at 240 Hz
-            state = sim.step_simulation()
+        # Run simulation for 10 seconds at 240 Hz, printing every second
+        steps_per_print = 240
+        status_line = "Time: {:.1f}s, Pendulum: {:.1f}°, RMS Error: {:.3f}"
+        for _ in range(10):
+            for _ in range(steps_per_print):
+                state = sim.step_simulation(log_interval=steps_per_print)
             
-            if i % 240 == 0:  # Print every second
-                print(f"Time: {state['time']:.1f}s, "
-                      f"Pendulum: {state['pendulum_angle']:.1f}°, "
-                      f"RMS Error: {state['metrics']['rms_error']:.3f}")
+            print(status_line.format(state['time'], state['pendulum_angle'],
+                                     state['metrics']['rms_error']))
         
         sim.close()
     else:
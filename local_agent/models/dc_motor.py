@@ -13,7 +13,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MotorParameters:
     """
     DC Motor Parameters derived from first principles measurements
@@ -165,6 +165,35 @@ class DCMotorModel:
         
         return time_out, response
     
+    def step_response_at(self, step_voltage: float, time_points: np.ndarray) -> np.ndarray:
+        """
+        Speed step response from rest, evaluated at arbitrary time points
+        
+        Closed form from the partial fractions of G(s)/s, so the samples need
+        not be evenly spaced (e.g. hardware timestamps).
+        """
+        R, L, J, b, Kt, Ke = (self.params.R, self.params.L, self.params.J,
+                             self.params.b, self.params.Kt, self.params.Ke)
+        a2 = L * J
+        a1 = R * J + L * b
+        a0 = R * b + Kt * Ke
+        
+        t = np.asarray(time_points, dtype=np.float64)
+        p1, p2 = np.roots([a2, a1, a0]).astype(complex)
+        
+        if np.isclose(p1, p2):
+            # Repeated pole: Kt/a0 * (1 - e^pt + p*t*e^pt)
+            p = p1.real
+            e = np.exp(p * t)
+            response = Kt / a0 * (1.0 - e + p * t * e)
+        else:
+            # Kt/a0 + r1*e^(p1*t) + r2*e^(p2*t)
+            r1 = Kt / (a2 * p1 * (p1 - p2))
+            r2 = Kt / (a2 * p2 * (p2 - p1))
+            response = (Kt / a0 + r1 * np.exp(p1 * t) + r2 * np.exp(p2 * t)).real
+        
+        return step_voltage * response
+    
     def simulate_real_time(self, voltage_input: float, load_torque: float = 0.0, 
                           dt: float = 0.001) -> Dict[str, float]:
         """
@@ -7,7 +7,7 @@ for PyBullet simulation integration.
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
 import os
 import shutil
@@ -214,30 +214,41 @@ async def generate_urdf_from_uploads():
 
 @router.get("/list-uploads")
 async def list_uploaded_files():
-    """List all uploaded model files"""
+    """List all uploaded model files
     
-    files = []
-    
-    if os.path.exists(UPLOAD_DIR):
-        for filename in os.listdir(UPLOAD_DIR):
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            file_ext = Path(filename).suffix.lower()
-            
-            if file_ext in ALLOWED_EXTENSIONS:
-                file_stat = os.stat(file_path)
-                files.append({
-                    "filename": filename,
-                    "path": file_path,
-                    "size": file_stat.st_size,
-                    "format": file_ext,
-                    "modified": file_stat.st_mtime
-                })
+    Entries are streamed one at a time while the upload directory is scanned,
+    so memory use stays bounded no matter how many meshes have been uploaded.
+    """
     
-    return JSONResponse({
-        "success": True,
-        "files": files,
-        "count": len(files)
-    })
+    def _generate():
+        yield b'{"success": true, "files": ['
+        count = 0
+        
+        if os.path.exists(UPLOAD_DIR):
+            with os.scandir(UPLOAD_DIR) as entries:
+                for entry in entries:
+                    file_ext = Path(entry.name).suffix.lower()
+                    
+                    if file_ext in ALLOWED_EXTENSIONS:
+                        try:
+                            file_stat = entry.stat()
+                        except OSError:
+                            # Removed or unreadable mid-scan; the 200 is already
+                            # sent, so skip it rather than truncate the JSON
+                            continue
+                        file_info = {
+                            "filename": entry.name,
+                            "path": os.path.join(UPLOAD_DIR, entry.name),
+                            "size": file_stat.st_size,
+                            "format": file_ext,
+                            "modified": file_stat.st_mtime
+                        }
+                        yield (b", " if count else b"") + json.dumps(file_info).encode("utf-8")
+                        count += 1
+        
+        yield f'], "count": {count}}}'.encode("utf-8")
+    
+    return StreamingResponse(_generate(), media_type="application/json")
 
 @router.get("/download-urdf")
 async def download_generated_urdf():
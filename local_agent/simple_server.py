@@ -6,16 +6,27 @@ Launches the educational system with a simple web interface
 
 import os
 import sys
+import time
 import asyncio
+import hashlib
 import webbrowser
+from contextlib import asynccontextmanager
+from email.utils import formatdate
 from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Literal
 
 # Add the local_agent directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from fastapi import FastAPI, HTTPException
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, ConfigDict
+import orjson
 import uvicorn
 
 # Import educational modules
@@ -23,392 +34,288 @@ try:
     from models.comprehensive_dc_motor_education import ComprehensiveDCMotorEducationalSystem
     from models.dc_motor import MotorParameters
     educational_system_available = True
+    
+    # Demo motor parameters, shared by every request
+    DEMO_MOTOR_PARAMS = MotorParameters(
+        R=2.5,      # 2.5 Ohms resistance
+        L=0.001,    # 1 mH inductance  
+        J=0.0001,   # 0.1 g⋅cm² inertia
+        b=0.00005,  # Friction coefficient
+        Kt=0.05,    # 0.05 N⋅m/A torque constant
+        Ke=0.05     # 0.05 V⋅s/rad back-EMF constant
+    )
 except ImportError as e:
     print(f"Warning: Educational system not available: {e}")
     educational_system_available = False
 
+# Server configuration
+HOST = "0.0.0.0"
+PORT = 8000
+STATIC_DIR = Path(__file__).parent / "static"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared educational system and open the browser once the server has started"""
+    # Sync handlers run in AnyIO's process-wide threadpool; only resize it
+    # when main() (or the operator) asked for a size
+    threadpool_size = os.environ.get("CTRLHUB_THREADPOOL_SIZE")
+    if threadpool_size:
+        to_thread.current_default_thread_limiter().total_tokens = int(threadpool_size)
+    
+    app.state.educational_system = None
+    if educational_system_available:
+        app.state.educational_system = await asyncio.to_thread(
+            ComprehensiveDCMotorEducationalSystem,
+            arduino_interface=None,  # Simulation mode
+            motor_params=DEMO_MOTOR_PARAMS
+        )
+    
+    # Off unless main() opts in, so TestClient and external runners stay headless
+    if os.environ.get("CTRLHUB_OPEN_BROWSER", "0") == "1":
+        asyncio.get_running_loop().call_later(0.5, webbrowser.open, f"http://localhost:{PORT}")
+    yield
+
 app = FastAPI(
     title="CtrlHub Educational Platform",
     description="DC Motor Control Systems Education",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware; the page is served from this server, so only its own
+# origins need to be allowed
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[f"http://localhost:{PORT}", f"http://127.0.0.1:{PORT}"],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "if-none-match"],
 )
 
-# Global educational system instance
-educational_system = None
+# Compress the landing page and larger JSON payloads on the wire
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static assets referenced by content-hashed URLs"""
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/static", ImmutableStaticFiles(directory=STATIC_DIR), name="static")
+
+# Serialized /demo payload; the report only changes when a module is started
+demo_response_cache = None
+demo_response_etag = None
+demo_response_last_modified = None
+demo_cache_lock = asyncio.Lock()
+
+# API request/response models; instances are immutable and reject unknown fields
+class StatusResponse(BaseModel):
+    """Payload of /api/status"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    status: str
+    educational_system: bool
+    version: str
+    platform: str
+    modules_available: List[str]
+    server_time: float
+
+class CurriculumModule(BaseModel):
+    """One module of the curriculum overview"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    module: str
+    duration: str
+    description: str
+    objectives: List[str]
+
+class CurriculumResponse(BaseModel):
+    """Payload of /api/curriculum"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    curriculum: List[CurriculumModule]
+    total_duration: str
+    prerequisite: str
+
+class DemoResponse(BaseModel):
+    """Payload of a successful /demo run"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    status: str
+    message: str
+    motor_parameters: Dict[str, float]
+    demo_results: Dict[str, Any]
+    next_steps: List[str]
+
+class StartModuleRequest(BaseModel):
+    """Request body for /api/start-module; Pydantic rejects unknown modules"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    module_name: Literal[
+        "module_1_introduction",
+        "module_2_parameter_extraction",
+        "module_3_first_principles_modeling",
+        "module_4_open_loop_control",
+        "module_5_feedback_control_theory",
+        "module_6_advanced_control",
+        "module_7_system_integration"
+    ]
+
+class StartModuleResponse(BaseModel):
+    """Payload of /api/start-module"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
+    status: str
+    module: str
+    result: Dict[str, Any]
+
+def _etag(content: bytes, weak: bool = False) -> str:
+    """ETag from the SHA-1 of a response body"""
+    tag = '"' + hashlib.sha1(content).hexdigest()[:16] + '"'
+    return "W/" + tag if weak else tag
+
+# Modules reported by /api/status; fixed once the imports above have run
+MODULES_AVAILABLE = (
+    "Parameter Extraction",
+    "First-Principles Modeling",
+    "Control Systems Design",
+    "Comprehensive Education"
+) if educational_system_available else ()
+
+# Fixed part of the /api/status payload. The ETag covers only these fields,
+# not server_time, so polling clients get a 304 while nothing has changed;
+# it is a weak validator because each 200 body carries a different server_time
+SYSTEM_STATUS = {
+    "status": "running",
+    "educational_system": educational_system_available,
+    "version": "1.0.0",
+    "platform": "CtrlHub",
+    "modules_available": MODULES_AVAILABLE
+}
+STATUS_ETAG = _etag(orjson.dumps(SYSTEM_STATUS), weak=True)
+
+# Handlers below return pre-serialized Responses, which FastAPI does not
+# check against response_model; validate the fixed payload once here
+StatusResponse.model_validate({**SYSTEM_STATUS, "server_time": 0.0})
+
+# Serialized status with the closing brace dropped, ready for server_time
+STATUS_JSON_PREFIX = orjson.dumps(SYSTEM_STATUS)[:-1] + b',"server_time":'
+
+# Server start time, used as Last-Modified for content fixed at import
+STARTUP_LAST_MODIFIED = formatdate(time.time(), usegmt=True)
+
+# Curriculum overview served by /api/curriculum; serialized once at import
+CURRICULUM = {
+    "curriculum": [
+        {
+            "module": "Module 1: Introduction & Safety",
+            "duration": "30 minutes",
+            "description": "Control systems fundamentals and safety protocols",
+            "objectives": ["Understand DC motor basics", "Learn safety procedures", "Setup hardware"]
+        },
+        {
+            "module": "Module 2: Parameter Extraction", 
+            "duration": "90 minutes",
+            "description": "Hands-on measurement techniques",
+            "objectives": ["Measure resistance", "Extract back-EMF", "Analyze inertia/friction"]
+        },
+        {
+            "module": "Module 3: First-Principles Modeling",
+            "duration": "60 minutes", 
+            "description": "Physics-based mathematical models",
+            "objectives": ["Apply Kirchhoff's laws", "Use Newton's dynamics", "Derive transfer functions"]
+        },
+        {
+            "module": "Module 4: Open-Loop Analysis",
+            "duration": "45 minutes",
+            "description": "System limitations understanding", 
+            "objectives": ["Analyze step response", "Understand limitations", "Need for feedback"]
+        },
+        {
+            "module": "Module 5: Feedback Control Theory",
+            "duration": "75 minutes",
+            "description": "PID controller fundamentals",
+            "objectives": ["Learn PID structure", "Understand stability", "Implement controllers"]
+        },
+        {
+            "module": "Module 6: Advanced Control Design",
+            "duration": "120 minutes",
+            "description": "Multiple PID tuning methods",
+            "objectives": ["Ziegler-Nichols tuning", "Pole placement", "Frequency domain design"]
+        },
+        {
+            "module": "Module 7: Real-World Applications", 
+            "duration": "90 minutes",
+            "description": "Hardware validation and optimization",
+            "objectives": ["Hardware integration", "Performance testing", "Real-world validation"]
+        }
+    ],
+    "total_duration": "8.5 hours",
+    "prerequisite": "Basic understanding of physics and mathematics"
+}
+CURRICULUM_JSON = CurriculumResponse.model_validate(CURRICULUM).model_dump_json().encode("utf-8")
+CURRICULUM_ETAG = _etag(CURRICULUM_JSON)
+
+def _conditional_response(request: Request, content, media_type: str, etag: str, cache_control: str,
+                          last_modified: str = STARTUP_LAST_MODIFIED) -> Response:
+    """Return 304 when the client already holds this content, otherwise the full body"""
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since") == last_modified:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=content, media_type=media_type, headers=headers)
+
+# Landing page template; only the educational system status varies, so the
+# page is rendered once at import instead of on every request
+MAIN_PAGE_TEMPLATE = Template((STATIC_DIR / "index.html").read_text(encoding="utf-8"))
+
+# The stylesheet URL carries a content hash, so browsers can cache it forever
+STYLESHEET_HASH = hashlib.sha1((STATIC_DIR / "ctrlhub.css").read_bytes()).hexdigest()[:8]
+
+MAIN_PAGE_HTML = MAIN_PAGE_TEMPLATE.substitute(
+    stylesheet_href=f"/static/ctrlhub.css?v={STYLESHEET_HASH}",
+    status_class='status-success' if educational_system_available else 'status-warning',
+    status_label='✓ Educational System Ready' if educational_system_available else '⚠ Educational System Loading...'
+)
+MAIN_PAGE_ETAG = _etag(MAIN_PAGE_HTML.encode("utf-8"))
 
 @app.get("/", response_class=HTMLResponse)
-async def get_main_page():
+def get_main_page(request: Request):
     """Serve the main educational platform page"""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>CtrlHub - Control Systems Education</title>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@300;400;500;600;700&family=Orbitron:wght@400;500;600;700;900&display=swap');
-            
-            :root {{
-                --primary-green: #00ff41;
-                --secondary-green: #008f11;
-                --dark-green: #003d00;
-                --accent-orange: #ff6b35;
-                --accent-yellow: #ffcc02;
-                --warm-white: #f5f3f0;
-                --paper-white: #fefdf8;
-                --charcoal: #2a2a2a;
-                --light-gray: #d4d4aa;
-                --border-green: #00aa30;
-                --shadow-green: rgba(0, 255, 65, 0.2);
-                --grid-pattern: #e8e8d4;
-            }}
-            
-            body {{
-                margin: 0;
-                padding: 0;
-                font-family: 'JetBrains Mono', 'Monaco', 'Menlo', monospace;
-                line-height: 1.6;
-                background: var(--paper-white);
-                color: var(--charcoal);
-                background-image: radial-gradient(circle at 20px 20px, var(--grid-pattern) 1px, transparent 1px);
-                background-size: 40px 40px;
-                min-height: 100vh;
-            }}
-            .container {{
-                max-width: 1200px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .hero {{
-                text-align: center;
-                padding: 60px 20px;
-                border: 2px solid var(--primary-green);
-                background: var(--paper-white);
-                margin: 20px 0;
-                box-shadow: 0 0 20px var(--shadow-green);
-            }}
-            .hero h1 {{
-                font-family: 'Orbitron', monospace;
-                font-size: 3.5rem;
-                margin-bottom: 20px;
-                color: var(--primary-green);
-                text-shadow: 2px 2px 4px var(--shadow-green);
-                font-weight: 700;
-            }}
-            .hero p {{
-                font-size: 1.2rem;
-                color: var(--charcoal);
-            }}
-            .card {{
-                background: var(--paper-white);
-                border: 2px solid var(--border-green);
-                padding: 30px;
-                margin: 20px 0;
-                box-shadow: 4px 4px 0px var(--primary-green);
-                position: relative;
-            }}
-            .card::before {{
-                content: '';
-                position: absolute;
-                top: -2px;
-                left: -2px;
-                right: -2px;
-                bottom: -2px;
-                background: var(--primary-green);
-                z-index: -1;
-                opacity: 0.1;
-            }}
-            .features {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                gap: 30px;
-                margin: 40px 0;
-            }}
-            .feature {{
-                text-align: center;
-                padding: 20px;
-                border: 2px solid var(--border-green);
-                background: var(--paper-white);
-                box-shadow: 4px 4px 0px var(--primary-green);
-            }}
-            .feature h3 {{
-                color: var(--primary-green);
-                margin-bottom: 15px;
-                font-size: 1.5rem;
-                font-family: 'Orbitron', monospace;
-                font-weight: 600;
-            }}
-            .btn {{
-                background: var(--primary-green);
-                color: var(--charcoal);
-                border: 2px solid var(--border-green);
-                padding: 12px 24px;
-                font-size: 16px;
-                cursor: pointer;
-                transition: all 0.2s;
-                text-decoration: none;
-                display: inline-block;
-                font-family: 'JetBrains Mono', monospace;
-                font-weight: 600;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }}
-            .btn:hover {{
-                background: var(--secondary-green);
-                box-shadow: 4px 4px 0px var(--dark-green);
-                transform: translate(-2px, -2px);
-            }}
-            .status {{
-                display: inline-block;
-                padding: 8px 16px;
-                font-weight: bold;
-                margin: 10px 0;
-                border: 2px solid;
-                font-family: 'JetBrains Mono', monospace;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }}
-            .status-success {{
-                background: var(--primary-green);
-                color: var(--charcoal);
-                border-color: var(--border-green);
-            }}
-            .status-warning {{
-                background: var(--accent-orange);
-                color: var(--paper-white);
-                border-color: var(--accent-orange);
-            }}
-            .api-demo {{
-                background: var(--warm-white);
-                padding: 20px;
-                margin: 20px 0;
-                border: 2px solid var(--border-green);
-                box-shadow: 4px 4px 0px var(--primary-green);
-            }}
-            .api-demo h4 {{
-                color: var(--primary-green);
-                margin-bottom: 10px;
-                font-family: 'Orbitron', monospace;
-                font-weight: 600;
-            }}
-            .api-url {{
-                background: var(--charcoal);
-                color: #0f0;
-                padding: 10px;
-                border-radius: 5px;
-                font-family: monospace;
-                margin: 5px 0;
-            }}
-            @media (max-width: 768px) {{
-                .hero h1 {{ font-size: 2.5rem; }}
-                .features {{ grid-template-columns: 1fr; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="hero">
-            <div class="container">
-                <h1>🎯 CtrlHub</h1>
-                <p>Advanced Control Systems Education Platform</p>
-                <p style="font-size: 1rem; opacity: 0.8;">
-                    Learn DC motor control through hands-on experiments, first-principles modeling, and advanced PID design
-                </p>
-            </div>
-        </div>
-
-        <div class="container">
-            <div class="card">
-                <h2 style="color: #667eea;">🚀 System Status</h2>
-                <div class="status status-success">✓ Web Server Running</div>
-                <div class="status {'status-success' if educational_system_available else 'status-warning'}">
-                    {'✓ Educational System Ready' if educational_system_available else '⚠ Educational System Loading...'}
-                </div>
-                <p style="color: #666; margin-top: 20px;">
-                    Server running on <strong>http://localhost:8000</strong>
-                </p>
-            </div>
-
-            <div class="card">
-                <h2 style="color: #667eea;">📚 Educational Features</h2>
-                <div class="features">
-                    <div class="feature">
-                        <h3>🔬 Parameter Extraction</h3>
-                        <p>Learn to measure motor parameters through hands-on experiments including resistance, back-EMF, torque constant, and inertia analysis.</p>
-                    </div>
-                    <div class="feature">
-                        <h3>📐 First-Principles Modeling</h3>
-                        <p>Derive motor equations from Kirchhoff's and Newton's laws. Build mathematical models from fundamental physics principles.</p>
-                    </div>
-                    <div class="feature">
-                        <h3>🎛️ PID Controller Design</h3>
-                        <p>Master multiple PID tuning methods including Ziegler-Nichols, pole placement, frequency domain, and genetic algorithms.</p>
-                    </div>
-                    <div class="feature">
-                        <h3>⚡ Hardware Integration</h3>
-                        <p>Validate theory with real Arduino-based motor control. Bridge the gap between simulation and real-world applications.</p>
-                    </div>
-                </div>
-            </div>
-
-            <div class="card">
-                <h2 style="color: #667eea;">🎓 7-Module Progressive Curriculum</h2>
-                <div style="display: grid; gap: 15px;">
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 1: Introduction & Safety</strong> (30 min) - Fundamentals and safety protocols
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 2: Parameter Extraction</strong> (90 min) - Hands-on measurement techniques
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 3: First-Principles Modeling</strong> (60 min) - Physics-based mathematical models
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 4: Open-Loop Analysis</strong> (45 min) - System limitations understanding
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 5: Feedback Control Theory</strong> (75 min) - PID fundamentals
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 6: Advanced Control Design</strong> (120 min) - Multiple tuning methods
-                    </div>
-                    <div style="padding: 15px; border: 2px solid #e0e0e0; border-radius: 10px; background: rgba(102, 126, 234, 0.05);">
-                        <strong>Module 7: Real-World Applications</strong> (90 min) - Hardware validation
-                    </div>
-                </div>
-                
-                <div style="text-align: center; margin-top: 30px;">
-                    <a href="/demo" class="btn" style="font-size: 18px; padding: 15px 30px;">
-                        🚀 Start Educational Demo
-                    </a>
-                    <a href="/api/docs" class="btn" style="font-size: 16px; padding: 12px 24px; margin-left: 10px;">
-                        📖 API Documentation
-                    </a>
-                </div>
-            </div>
-
-            <div class="card">
-                <h2 style="color: #667eea;">🔧 API Endpoints</h2>
-                <div class="api-demo">
-                    <h4>Available Educational Endpoints:</h4>
-                    <div class="api-url">GET /api/status - System status</div>
-                    <div class="api-url">GET /api/curriculum - Curriculum overview</div>
-                    <div class="api-url">POST /api/start-module - Start educational module</div>
-                    <div class="api-url">GET /api/demo - Run educational demo</div>
-                    <div class="api-url">GET /docs - Interactive API documentation</div>
-                </div>
-            </div>
-
-            <div style="text-align: center; padding: 40px 0; color: white;">
-                <p style="opacity: 0.8;">
-                    CtrlHub - Bridging Theory and Practice in Control Systems Education
-                </p>
-                <p style="opacity: 0.6; font-size: 14px;">
-                    Open Source Educational Platform | MIT License
-                </p>
-            </div>
-        </div>
-
-        <script>
-            // Auto-refresh system status
-            setInterval(async () => {{
-                try {{
-                    const response = await fetch('/api/status');
-                    const status = await response.json();
-                    console.log('System status:', status);
-                }} catch (error) {{
-                    console.log('Status check error:', error);
-                }}
-            }}, 10000);
-        </script>
-    </body>
-    </html>
-    """
-    return html_content
-
-@app.get("/api/status")
-async def get_system_status():
+    return _conditional_response(request, MAIN_PAGE_HTML, "text/html", MAIN_PAGE_ETAG, "public, max-age=60")
+
+# response_model on the pre-serialized routes only documents the schema;
+# their payloads are validated at import (status, curriculum)
+@app.get("/api/status", response_class=ORJSONResponse, response_model=StatusResponse)
+def get_system_status(request: Request):
     """Get current system status"""
-    return {
-        "status": "running",
-        "educational_system": educational_system_available,
-        "version": "1.0.0",
-        "platform": "CtrlHub",
-        "modules_available": [
-            "Parameter Extraction",
-            "First-Principles Modeling", 
-            "Control Systems Design",
-            "Comprehensive Education"
-        ] if educational_system_available else [],
-        "server_time": asyncio.get_event_loop().time()
-    }
+    content = STATUS_JSON_PREFIX + f"{time.monotonic():.3f}}}".encode("ascii")
+    return _conditional_response(request, content, "application/json", STATUS_ETAG, "no-cache")
 
-@app.get("/api/curriculum")
-async def get_curriculum():
+@app.get("/api/curriculum", response_class=ORJSONResponse, response_model=CurriculumResponse)
+def get_curriculum(request: Request):
     """Get educational curriculum overview"""
     if not educational_system_available:
         raise HTTPException(status_code=503, detail="Educational system not available")
     
-    return {
-        "curriculum": [
-            {
-                "module": "Module 1: Introduction & Safety",
-                "duration": "30 minutes",
-                "description": "Control systems fundamentals and safety protocols",
-                "objectives": ["Understand DC motor basics", "Learn safety procedures", "Setup hardware"]
-            },
-            {
-                "module": "Module 2: Parameter Extraction", 
-                "duration": "90 minutes",
-                "description": "Hands-on measurement techniques",
-                "objectives": ["Measure resistance", "Extract back-EMF", "Analyze inertia/friction"]
-            },
-            {
-                "module": "Module 3: First-Principles Modeling",
-                "duration": "60 minutes", 
-                "description": "Physics-based mathematical models",
-                "objectives": ["Apply Kirchhoff's laws", "Use Newton's dynamics", "Derive transfer functions"]
-            },
-            {
-                "module": "Module 4: Open-Loop Analysis",
-                "duration": "45 minutes",
-                "description": "System limitations understanding", 
-                "objectives": ["Analyze step response", "Understand limitations", "Need for feedback"]
-            },
-            {
-                "module": "Module 5: Feedback Control Theory",
-                "duration": "75 minutes",
-                "description": "PID controller fundamentals",
-                "objectives": ["Learn PID structure", "Understand stability", "Implement controllers"]
-            },
-            {
-                "module": "Module 6: Advanced Control Design",
-                "duration": "120 minutes",
-                "description": "Multiple PID tuning methods",
-                "objectives": ["Ziegler-Nichols tuning", "Pole placement", "Frequency domain design"]
-            },
-            {
-                "module": "Module 7: Real-World Applications", 
-                "duration": "90 minutes",
-                "description": "Hardware validation and optimization",
-                "objectives": ["Hardware integration", "Performance testing", "Real-world validation"]
-            }
-        ],
-        "total_duration": "8.5 hours",
-        "prerequisite": "Basic understanding of physics and mathematics"
-    }
+    return _conditional_response(request, CURRICULUM_JSON, "application/json", CURRICULUM_ETAG, "public, max-age=300")
 
-@app.get("/demo")
-async def run_educational_demo():
+# DemoResponse documents the schema only; the report is built per cache fill
+@app.get("/demo", response_class=ORJSONResponse, responses={200: {"model": DemoResponse}})
+async def run_educational_demo(request: Request):
     """Run a comprehensive educational demo"""
     if not educational_system_available:
         return HTMLResponse("""
@@ -420,47 +327,23 @@ async def run_educational_demo():
         </body></html>
         """)
     
+    global demo_response_cache, demo_response_etag, demo_response_last_modified
+    if demo_response_cache is not None:
+        return _conditional_response(request, demo_response_cache, "application/json", demo_response_etag,
+                                     "no-cache", demo_response_last_modified)
+    
     try:
-        # Initialize educational system with demo parameters
-        demo_motor_params = MotorParameters(
-            R=2.5,      # 2.5 Ohms resistance
-            L=0.001,    # 1 mH inductance  
-            J=0.0001,   # 0.1 g⋅cm² inertia
-            b=0.00005,  # Friction coefficient
-            Kt=0.05,    # 0.05 N⋅m/A torque constant
-            Ke=0.05     # 0.05 V⋅s/rad back-EMF constant
-        )
-        
-        # Create educational system instance
-        global educational_system
-        if educational_system is None:
-            educational_system = ComprehensiveDCMotorEducationalSystem(
-                arduino_interface=None,  # Simulation mode
-                motor_params=demo_motor_params
-            )
+        async with demo_cache_lock:
+            if demo_response_cache is None:
+                # Building the report is blocking work; keep it off the event loop
+                demo_response_cache = await asyncio.to_thread(
+                    _build_demo_response, request.app.state.educational_system
+                )
+                demo_response_etag = _etag(demo_response_cache)
+                demo_response_last_modified = formatdate(time.time(), usegmt=True)
         
-        # Generate a comprehensive report
-        demo_results = educational_system.generate_comprehensive_educational_report()
-        
-        return {
-            "status": "success",
-            "message": "Educational demo completed successfully",
-            "motor_parameters": {
-                "resistance": demo_motor_params.R,
-                "inductance": demo_motor_params.L,
-                "inertia": demo_motor_params.J,
-                "friction": demo_motor_params.b,
-                "torque_constant": demo_motor_params.Kt,
-                "back_emf_constant": demo_motor_params.Ke
-            },
-            "demo_results": demo_results,
-            "next_steps": [
-                "Connect Arduino hardware for hands-on experiments",
-                "Run parameter extraction experiments",
-                "Design and test PID controllers",
-                "Validate models with real hardware"
-            ]
-        }
+        return _conditional_response(request, demo_response_cache, "application/json", demo_response_etag,
+                                     "no-cache", demo_response_last_modified)
         
     except Exception as e:
         return {
@@ -469,24 +352,48 @@ async def run_educational_demo():
             "suggestion": "Check system logs for detailed error information"
         }
 
-@app.post("/api/start-module")
-async def start_educational_module(module_name: str):
+def _build_demo_response(educational_system) -> bytes:
+    """Run the educational demo and serialize the successful result"""
+    # Generate a comprehensive report
+    demo_results = educational_system.generate_comprehensive_educational_report()
+    
+    return orjson.dumps({
+        "status": "success",
+        "message": "Educational demo completed successfully",
+        "motor_parameters": {
+            "resistance": DEMO_MOTOR_PARAMS.R,
+            "inductance": DEMO_MOTOR_PARAMS.L,
+            "inertia": DEMO_MOTOR_PARAMS.J,
+            "friction": DEMO_MOTOR_PARAMS.b,
+            "torque_constant": DEMO_MOTOR_PARAMS.Kt,
+            "back_emf_constant": DEMO_MOTOR_PARAMS.Ke
+        },
+        "demo_results": demo_results,
+        "next_steps": [
+            "Connect Arduino hardware for hands-on experiments",
+            "Run parameter extraction experiments",
+            "Design and test PID controllers",
+            "Validate models with real hardware"
+        ]
+    }, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+@app.post("/api/start-module", response_class=ORJSONResponse, response_model=StartModuleResponse)
+async def start_educational_module(start_request: StartModuleRequest, request: Request):
     """Start a specific educational module"""
+    module_name = start_request.module_name
     if not educational_system_available:
         raise HTTPException(status_code=503, detail="Educational system not available")
     
     try:
-        global educational_system
-        if educational_system is None:
-            # Initialize with default parameters
-            demo_motor_params = MotorParameters(R=2.5, L=0.001, J=0.0001, b=0.00005, Kt=0.05, Ke=0.05)
-            educational_system = ComprehensiveDCMotorEducationalSystem(
-                arduino_interface=None,
-                motor_params=demo_motor_params
-            )
+        global demo_response_cache
+        
+        # The journey updates the progress the demo report reads, so run it
+        # under the lock: no report is built while the state is mid-update,
+        # and the cached report is cleared before anyone can read it stale
+        async with demo_cache_lock:
+            result = await request.app.state.educational_system.start_educational_journey(module_name)
+            demo_response_cache = None
         
-        # Start the educational journey
-        result = await educational_system.start_educational_journey(module_name)
         return {
             "status": "success",
             "module": module_name,
@@ -501,30 +408,64 @@ def main():
     print("🎯 Starting CtrlHub Educational Platform...")
     print(f"📚 Educational system available: {educational_system_available}")
     
-    # Configuration
-    host = "0.0.0.0"
-    port = 8000
+    # Each worker process runs its own lifespan, so student progress and the
+    # demo cache are per worker; keep one worker unless asked for more
+    workers = int(os.getenv("CTRLHUB_WORKERS", "1"))
+    # Every worker runs the lifespan, so only a single-worker server opens
+    # the browser; with more workers the URL is printed instead
+    open_browser = workers == 1 and os.environ.get("CTRLHUB_OPEN_BROWSER", "1") == "1"
+    os.environ["CTRLHUB_OPEN_BROWSER"] = "1" if open_browser else "0"
+    # Threadpool for the sync handlers, sized for concurrent polling tabs
+    os.environ.setdefault("CTRLHUB_THREADPOOL_SIZE", "64")
     
-    print(f"🚀 Server starting on http://{host}:{port}")
-    print("🌐 Opening browser...")
+    print(f"🚀 Server starting on http://{HOST}:{PORT}")
+    if open_browser:
+        print("🌐 Opening browser...")
+    elif workers > 1:
+        print(f"🌐 Open http://localhost:{PORT} in your browser")
     
-    # Open browser after a short delay
-    def open_browser():
-        import time
-        time.sleep(2)
-        webbrowser.open(f"http://localhost:{port}")
+    # Prefer the libuv event loop and httptools parser; uvloop is not
+    # available on Windows, so fall back to the stock asyncio loop there
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
     
-    import threading
-    threading.Thread(target=open_browser, daemon=True).start()
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    
+    # Per-request access logging is only useful while developing
+    debug = os.getenv("DEBUG") == "1"
+    
+    if workers > 1:
+        # Multiple workers need the app as an import string
+        uvicorn.run(
+            "simple_server:app",
+            host=HOST,
+            port=PORT,
+            workers=workers,
+            log_level="info" if debug else "warning",
+            access_log=debug,
+            loop=loop,
+            http=http
+        )
+        return
     
     # Start the server
-    uvicorn.run(
+    config = uvicorn.Config(
         app,
-        host=host,
-        port=port,
-        log_level="info",
-        access_log=True
+        host=HOST,
+        port=PORT,
+        log_level="info" if debug else "warning",
+        access_log=debug,
+        loop=loop,
+        http=http
     )
+    uvicorn.Server(config).run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
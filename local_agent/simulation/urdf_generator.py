@@ -7,69 +7,168 @@ for PyBullet physics simulation with accurate mass properties and joints.
 """
 
 import os
+import copy
 import json
-import numpy as np
-from typing import Dict, List, Tuple, Optional
+import threading
+from typing import Dict, Tuple, Optional
 from pathlib import Path
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement
+from xml.sax.saxutils import escape
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Top-level GLTF sections analyze_gltf reads; buffers, accessors etc. are skipped
+GLTF_SECTIONS = frozenset({'nodes', 'materials', 'meshes'})
+GLTF_CACHE_SIZE = 8  # Most recent analyze_gltf results kept in memory
+
+# GLTF node-name classifiers in priority order: (component, default mesh index, keywords)
+GLTF_COMPONENT_KEYWORDS = (
+    ('base', 0, ('base', 'mount', 'platform')),
+    ('arm', 1, ('arm', 'lever', 'motor')),
+    ('pendulum', 2, ('pendulum', 'rod', 'stick')),
+)
+
+# (link name, component type) for each link, in document order
+URDF_LINKS = (
+    ("base_link", "base"),
+    ("motor_arm", "arm"),
+    ("pendulum", "pendulum"),
+)
+
+# Mesh scale per visual source; STL exports are in millimetres
+MESH_SCALES = {
+    'gltf': "1 1 1",  # GLTF usually in correct units
+    'stl': "0.001 0.001 0.001",
+}
+
+# Primitive shape per component, used for collision and as the visual fallback
+PRIMITIVE_GEOMETRY = {
+    'base': ("cylinder", {"radius": "0.05", "length": "0.05"}),
+    'arm': ("box", {"size": "0.15 0.02 0.02"}),
+    'pendulum': ("cylinder", {"radius": "0.005", "length": "0.2"}),
+}
+
+# Default physical properties (estimated from typical rotary pendulum)
+LINK_PROPERTIES = {
+    'base': {
+        'mass': 0.5,
+        'com': [0, 0, 0.025],
+        'inertia': {'ixx': 0.001, 'iyy': 0.001, 'izz': 0.001}
+    },
+    'arm': {
+        'mass': 0.1,
+        'com': [0.075, 0, 0],
+        'inertia': {'ixx': 0.0001, 'iyy': 0.0005, 'izz': 0.0005}
+    },
+    'pendulum': {
+        'mass': 0.05,
+        'com': [0, 0, -0.1],
+        'inertia': {'ixx': 0.0002, 'iyy': 0.0002, 'izz': 0.000001}
+    }
+}
+
+# Default joint configurations
+JOINT_CONFIGS = {
+    'motor_joint': {
+        'type': 'revolute',
+        'parent': 'base_link',
+        'child': 'motor_arm',
+        'origin': [0, 0, 0.05],
+        'axis': [0, 0, 1],
+        'limits': {'lower': -3.14159, 'upper': 3.14159, 'effort': 2.0, 'velocity': 10.0},
+        'dynamics': {'damping': 0.01, 'friction': 0.05}
+    },
+    'pendulum_joint': {
+        'type': 'revolute',
+        'parent': 'motor_arm',
+        'child': 'pendulum',
+        'origin': [0.15, 0, 0],
+        'axis': [1, 0, 0],
+        'limits': {'lower': -3.14159, 'upper': 3.14159, 'effort': 0, 'velocity': 100},
+        'dynamics': {'damping': 0.001, 'friction': 0.001}
+    }
+}
+
+# Default component-specific colors
+LINK_COLORS = {
+    'base': "0.2 0.2 0.2 1.0",
+    'arm': "0.8 0.8 0.8 1.0",
+    'pendulum': "1.0 0.2 0.2 1.0"
+}
+
+# Serialized URDF templates kept per (layout, link and joint settings)
+URDF_TEMPLATE_CACHE_SIZE = 8
+
+# Escapes ElementTree applies to attribute values beyond &, < and >
+XML_ATTR_ENTITIES = {'"': "&quot;", "\r": "&#13;", "\n": "&#10;", "\t": "&#09;"}
+
+
+def _classify_gltf_node(node_name: str) -> Optional[Tuple[str, int]]:
+    """Return (component, default mesh index) for a GLTF node name, or None"""
+    name_lower = node_name.lower()
+    for component, default_mesh, keywords in GLTF_COMPONENT_KEYWORDS:
+        for keyword in keywords:
+            if keyword in name_lower:
+                return component, default_mesh
+    return None
+
+
+def _as_urdf_strings(value):
+    """Convert numeric leaves to URDF attribute strings (vectors become 'x y z')"""
+    if isinstance(value, dict):
+        return {key: _as_urdf_strings(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
 
 class URDFGenerator:
     """Generate URDF files from OnShape model data"""
     
+    # analyze_gltf results keyed by (absolute path, mtime_ns); shared by all
+    # instances since the routes create a generator per request
+    _gltf_cache: Dict[Tuple[str, int], Dict] = {}
+    _gltf_cache_lock = threading.Lock()
+    
+    # Serialized URDF format strings keyed by the visual source of each link
+    # and the generator's settings; only the mesh filenames differ between
+    # calls with the same key
+    _urdf_templates: Dict[Tuple[Tuple[str, ...], str], str] = {}
+    
     def __init__(self, project_root: str):
         self.project_root = project_root
-        self.meshes_dir = os.path.join(project_root, "meshes")
-        self.simulation_dir = os.path.join(project_root, "simulation")
-        os.makedirs(self.meshes_dir, exist_ok=True)
-        os.makedirs(self.simulation_dir, exist_ok=True)
-        
-        # Physical properties (estimated from typical rotary pendulum)
-        self.properties = {
-            'base': {
-                'mass': 0.5,
-                'com': [0, 0, 0.025],
-                'inertia': {'ixx': 0.001, 'iyy': 0.001, 'izz': 0.001}
-            },
-            'arm': {
-                'mass': 0.1,
-                'com': [0.075, 0, 0],
-                'inertia': {'ixx': 0.0001, 'iyy': 0.0005, 'izz': 0.0005}
-            },
-            'pendulum': {
-                'mass': 0.05,
-                'com': [0, 0, -0.1],
-                'inertia': {'ixx': 0.0002, 'iyy': 0.0002, 'izz': 0.000001}
-            }
-        }
+        self.meshes_dir = Path(project_root) / "meshes"
+        self.simulation_dir = Path(project_root) / "simulation"
+        for directory in (self.meshes_dir, self.simulation_dir):
+            directory.mkdir(parents=True, exist_ok=True)
         
-        # Joint configurations
-        self.joints = {
-            'motor_joint': {
-                'type': 'revolute',
-                'parent': 'base_link',
-                'child': 'motor_arm',
-                'origin': [0, 0, 0.05],
-                'axis': [0, 0, 1],
-                'limits': {'lower': -3.14159, 'upper': 3.14159, 'effort': 2.0, 'velocity': 10.0},
-                'dynamics': {'damping': 0.01, 'friction': 0.05}
-            },
-            'pendulum_joint': {
-                'type': 'revolute',
-                'parent': 'motor_arm',
-                'child': 'pendulum',
-                'origin': [0.15, 0, 0],
-                'axis': [1, 0, 0],
-                'limits': {'lower': -3.14159, 'upper': 3.14159, 'effort': 0, 'velocity': 100},
-                'dynamics': {'damping': 0.001, 'friction': 0.001}
-            }
-        }
+        # Per-instance copies, so callers can override any value
+        self.properties = copy.deepcopy(LINK_PROPERTIES)
+        self.joints = copy.deepcopy(JOINT_CONFIGS)
+        self.colors = dict(LINK_COLORS)
     
     def analyze_gltf(self, gltf_path: str) -> Dict:
-        """Analyze GLTF file to extract components and materials"""
+        """
+        Analyze GLTF file to extract components and materials
+        
+        Each call returns its own copy, so callers may modify the result.
+        """
         try:
-            with open(gltf_path, 'r') as f:
-                gltf_data = json.load(f)
+            # Reuse the analysis while the file is unchanged on disk
+            cache_key = (os.path.abspath(gltf_path), os.stat(gltf_path).st_mtime_ns)
+            with self._gltf_cache_lock:
+                cached = self._gltf_cache.pop(cache_key, None)
+                if cached is not None:
+                    # Reinsert so the least recently used entry stays first
+                    self._gltf_cache[cache_key] = cached
+                    return copy.deepcopy(cached)
+            
+            gltf_data = self._load_gltf_sections(gltf_path)
             
             components = {}
             
@@ -79,36 +178,47 @@ class URDFGenerator:
                     node_name = node.get('name', f'node_{i}')
                     
                     # Identify component type based on name
-                    if any(keyword in node_name.lower() for keyword in ['base', 'mount', 'platform']):
-                        components['base'] = {
+                    match = _classify_gltf_node(node_name)
+                    if match is not None:
+                        component, default_mesh = match
+                        components[component] = {
                             'node_index': i,
                             'name': node_name,
-                            'mesh_index': node.get('mesh', 0)
-                        }
-                    elif any(keyword in node_name.lower() for keyword in ['arm', 'lever', 'motor']):
-                        components['arm'] = {
-                            'node_index': i,
-                            'name': node_name,
-                            'mesh_index': node.get('mesh', 1)
-                        }
-                    elif any(keyword in node_name.lower() for keyword in ['pendulum', 'rod', 'stick']):
-                        components['pendulum'] = {
-                            'node_index': i,
-                            'name': node_name,
-                            'mesh_index': node.get('mesh', 2)
+                            'mesh_index': node.get('mesh', default_mesh)
                         }
             
-            return {
+            analysis = {
                 'components': components,
                 'materials': gltf_data.get('materials', []),
                 'meshes': gltf_data.get('meshes', []),
                 'success': True
             }
             
+            with self._gltf_cache_lock:
+                if len(self._gltf_cache) >= GLTF_CACHE_SIZE:
+                    del self._gltf_cache[next(iter(self._gltf_cache))]
+                self._gltf_cache[cache_key] = analysis
+            return copy.deepcopy(analysis)
+            
         except Exception as e:
             print(f"Error analyzing GLTF: {e}")
             return {'success': False, 'error': str(e)}
     
+    @staticmethod
+    def _load_gltf_sections(gltf_path: str) -> Dict:
+        """Read only the GLTF_SECTIONS of a GLTF file"""
+        if not IJSON_AVAILABLE:
+            # json decodes the bytes itself, skipping the text-mode wrapper
+            with open(gltf_path, 'rb') as f:
+                gltf_data = json.load(f)
+            return {key: gltf_data[key] for key in GLTF_SECTIONS if key in gltf_data}
+        
+        # Stream top-level members so embedded buffers never sit in memory
+        # alongside the rest of the document
+        with open(gltf_path, 'rb') as f:
+            return {key: value for key, value in ijson.kvitems(f, '', use_float=True)
+                    if key in GLTF_SECTIONS}
+    
     def create_rotary_pendulum_urdf(self, mesh_files: Dict[str, str], use_gltf: bool = True) -> str:
         """
         Create URDF for rotary inverted pendulum
@@ -117,158 +227,143 @@ class URDFGenerator:
             mesh_files: Dict mapping part names to mesh file paths
             use_gltf: Whether to use GLTF (True) or STL fallback (False)
         """
+        sources = [self._mesh_source(component_type, mesh_files, use_gltf)
+                   for _, component_type in URDF_LINKS]
+        layout = tuple(kind for kind, _ in sources)
+        # Overrides of properties, joints or colors select their own template
+        key = (layout, repr((self.properties, self.joints, self.colors)))
         
-        # Create root element
-        robot = ET.Element("robot")
-        robot.set("name", "rotary_inverted_pendulum")
+        template = self._urdf_templates.get(key)
+        if template is None:
+            if len(self._urdf_templates) >= URDF_TEMPLATE_CACHE_SIZE:
+                self._urdf_templates.pop(next(iter(self._urdf_templates)), None)
+            template = self._urdf_templates[key] = self._build_urdf_template(layout)
         
-        # Add base link
-        self._add_link(robot, "base_link", "base", mesh_files, use_gltf)
-        
-        # Add motor arm link
-        self._add_link(robot, "motor_arm", "arm", mesh_files, use_gltf)
+        # Fill this call's mesh files into the cached document text
+        return template.format(*[escape(filename, XML_ATTR_ENTITIES) if filename else ""
+                                 for _, filename in sources])
+    
+    @staticmethod
+    def _mesh_source(component_type: str, mesh_files: Dict[str, str],
+                     use_gltf: bool) -> Tuple[str, Optional[str]]:
+        """Pick the visual source for a link: ('gltf' | 'stl' | 'primitive', filename)"""
+        if use_gltf and "gltf" in mesh_files:
+            return 'gltf', mesh_files["gltf"]
+        if component_type in mesh_files:
+            return 'stl', mesh_files[component_type]
+        return 'primitive', None
+    
+    def _build_urdf_template(self, layout: Tuple[str, ...]) -> str:
+        """
+        Build and serialize the URDF for a layout once, as a str.format
+        template with a positional field per link's mesh filename
+        """
+        # Create root element
+        robot = Element("robot", name="rotary_inverted_pendulum")
         
-        # Add pendulum link
-        self._add_link(robot, "pendulum", "pendulum", mesh_files, use_gltf)
+        # Add base, motor arm and pendulum links
+        mesh_elements = [
+            self._add_link(robot, link_name, component_type, mesh_kind)
+            for (link_name, component_type), mesh_kind in zip(URDF_LINKS, layout)
+        ]
         
         # Add joints
         self._add_joint(robot, "motor_joint")
         self._add_joint(robot, "pendulum_joint")
         
-        # Convert to string with proper formatting
-        rough_string = ET.tostring(robot, 'unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
-    
-    def _add_link(self, parent: ET.Element, link_name: str, component_type: str, 
-                  mesh_files: Dict[str, str], use_gltf: bool):
-        """Add a link element to the URDF"""
-        link = ET.SubElement(parent, "link")
-        link.set("name", link_name)
+        # Mark mesh filenames with sentinels that survive serialization
+        for index, mesh in enumerate(mesh_elements):
+            if mesh is not None:
+                mesh.set("filename", f"@@mesh_{index}@@")
         
-        props = self.properties[component_type]
+        # Indent in place once (no minidom re-parse)
+        ET.indent(robot, space="  ")
+        document = ET.tostring(robot, encoding="unicode", xml_declaration=True)
         
-        # Inertial properties
-        inertial = ET.SubElement(link, "inertial")
-        origin = ET.SubElement(inertial, "origin")
-        origin.set("xyz", f"{props['com'][0]} {props['com'][1]} {props['com'][2]}")
-        origin.set("rpy", "0 0 0")
+        # Escape literal braces, then turn the sentinels into format fields
+        document = document.replace("{", "{{").replace("}", "}}")
+        for index in range(len(mesh_elements)):
+            document = document.replace(f"@@mesh_{index}@@", f"{{{index}}}")
+        return document
+    
+    def _add_link(self, parent: Element, link_name: str, component_type: str,
+                  mesh_kind: str) -> Optional[Element]:
+        """Add a link element to the URDF, returning its visual mesh element if any"""
+        link = SubElement(parent, "link", name=link_name)
         
-        mass = ET.SubElement(inertial, "mass")
-        mass.set("value", str(props['mass']))
+        props = _as_urdf_strings(self.properties[component_type])
+        inertia = props['inertia']
         
-        inertia = ET.SubElement(inertial, "inertia")
-        inertia.set("ixx", str(props['inertia']['ixx']))
-        inertia.set("ixy", "0")
-        inertia.set("ixz", "0")
-        inertia.set("iyy", str(props['inertia']['iyy']))
-        inertia.set("iyz", "0")
-        inertia.set("izz", str(props['inertia']['izz']))
+        # Inertial properties
+        inertial = SubElement(link, "inertial")
+        SubElement(inertial, "origin", xyz=props['com'], rpy="0 0 0")
+        SubElement(inertial, "mass", value=props['mass'])
+        SubElement(inertial, "inertia", ixx=inertia['ixx'], ixy="0", ixz="0",
+                   iyy=inertia['iyy'], iyz="0", izz=inertia['izz'])
         
         # Visual properties
-        visual = ET.SubElement(link, "visual")
-        v_origin = ET.SubElement(visual, "origin")
-        v_origin.set("xyz", "0 0 0")
-        v_origin.set("rpy", "0 0 0")
+        visual = SubElement(link, "visual")
+        SubElement(visual, "origin", xyz="0 0 0", rpy="0 0 0")
         
-        geometry = ET.SubElement(visual, "geometry")
+        geometry = SubElement(visual, "geometry")
         
-        # Choose mesh file
-        if use_gltf and "gltf" in mesh_files:
-            mesh = ET.SubElement(geometry, "mesh")
-            mesh.set("filename", mesh_files["gltf"])
-            mesh.set("scale", "1 1 1")  # GLTF usually in correct units
-        elif component_type in mesh_files:
-            mesh = ET.SubElement(geometry, "mesh")
-            mesh.set("filename", mesh_files[component_type])
-            mesh.set("scale", "0.001 0.001 0.001")  # Convert mm to m for STL
-        else:
-            # Fallback to primitive shapes
+        # Mesh placeholder (filename is filled in per call), or primitive fallback
+        mesh = None
+        if mesh_kind == 'primitive':
             self._add_primitive_geometry(geometry, component_type)
+        else:
+            mesh = SubElement(geometry, "mesh", filename="", scale=MESH_SCALES[mesh_kind])
         
         # Material
-        material = ET.SubElement(visual, "material")
-        material.set("name", f"{component_type}_material")
-        color = ET.SubElement(material, "color")
+        material = SubElement(visual, "material", name=f"{component_type}_material")
         
-        # Component-specific colors
-        colors = {
-            'base': "0.2 0.2 0.2 1.0",
-            'arm': "0.8 0.8 0.8 1.0",
-            'pendulum': "1.0 0.2 0.2 1.0"
-        }
-        color.set("rgba", colors.get(component_type, "0.5 0.5 0.5 1.0"))
+        SubElement(material, "color", rgba=self.colors.get(component_type, "0.5 0.5 0.5 1.0"))
         
         # Collision properties (simplified)
-        collision = ET.SubElement(link, "collision")
-        c_origin = ET.SubElement(collision, "origin")
-        c_origin.set("xyz", f"{props['com'][0]} {props['com'][1]} {props['com'][2]}")
-        c_origin.set("rpy", "0 0 0")
+        collision = SubElement(link, "collision")
+        SubElement(collision, "origin", xyz=props['com'], rpy="0 0 0")
         
-        c_geometry = ET.SubElement(collision, "geometry")
+        c_geometry = SubElement(collision, "geometry")
         self._add_primitive_geometry(c_geometry, component_type)
+        
+        return mesh
     
-    def _add_primitive_geometry(self, geometry: ET.Element, component_type: str):
+    def _add_primitive_geometry(self, geometry: Element, component_type: str):
         """Add primitive geometry for collision or fallback visual"""
-        if component_type == 'base':
-            cylinder = ET.SubElement(geometry, "cylinder")
-            cylinder.set("radius", "0.05")
-            cylinder.set("length", "0.05")
-        elif component_type == 'arm':
-            box = ET.SubElement(geometry, "box")
-            box.set("size", "0.15 0.02 0.02")
-        elif component_type == 'pendulum':
-            cylinder = ET.SubElement(geometry, "cylinder")
-            cylinder.set("radius", "0.005")
-            cylinder.set("length", "0.2")
+        primitive = PRIMITIVE_GEOMETRY.get(component_type)
+        if primitive is not None:
+            tag, attrib = primitive
+            SubElement(geometry, tag, attrib)
     
-    def _add_joint(self, parent: ET.Element, joint_name: str):
+    def _add_joint(self, parent: Element, joint_name: str):
         """Add a joint element to the URDF"""
-        joint_config = self.joints[joint_name]
+        joint_config = _as_urdf_strings(self.joints[joint_name])
         
-        joint = ET.SubElement(parent, "joint")
-        joint.set("name", joint_name)
-        joint.set("type", joint_config['type'])
+        joint = SubElement(parent, "joint", name=joint_name, type=joint_config['type'])
         
         # Parent and child links
-        parent_elem = ET.SubElement(joint, "parent")
-        parent_elem.set("link", joint_config['parent'])
-        
-        child_elem = ET.SubElement(joint, "child")
-        child_elem.set("link", joint_config['child'])
-        
-        # Origin
-        origin = ET.SubElement(joint, "origin")
-        xyz = joint_config['origin']
-        origin.set("xyz", f"{xyz[0]} {xyz[1]} {xyz[2]}")
-        origin.set("rpy", "0 0 0")
+        SubElement(joint, "parent", link=joint_config['parent'])
+        SubElement(joint, "child", link=joint_config['child'])
         
-        # Axis
-        axis = ET.SubElement(joint, "axis")
-        axis_vec = joint_config['axis']
-        axis.set("xyz", f"{axis_vec[0]} {axis_vec[1]} {axis_vec[2]}")
+        # Origin and axis
+        SubElement(joint, "origin", xyz=joint_config['origin'], rpy="0 0 0")
+        SubElement(joint, "axis", xyz=joint_config['axis'])
         
         # Limits
         if joint_config['type'] == 'revolute':
-            limit = ET.SubElement(joint, "limit")
             limits = joint_config['limits']
-            limit.set("lower", str(limits['lower']))
-            limit.set("upper", str(limits['upper']))
-            limit.set("effort", str(limits['effort']))
-            limit.set("velocity", str(limits['velocity']))
+            SubElement(joint, "limit", lower=limits['lower'], upper=limits['upper'],
+                       effort=limits['effort'], velocity=limits['velocity'])
         
         # Dynamics
-        dynamics = ET.SubElement(joint, "dynamics")
         dyn = joint_config['dynamics']
-        dynamics.set("damping", str(dyn['damping']))
-        dynamics.set("friction", str(dyn['friction']))
+        SubElement(joint, "dynamics", damping=dyn['damping'], friction=dyn['friction'])
     
     def save_urdf(self, urdf_content: str, filename: str = "rotary_pendulum.urdf") -> str:
         """Save URDF content to file"""
-        urdf_path = os.path.join(self.simulation_dir, filename)
-        with open(urdf_path, 'w') as f:
-            f.write(urdf_content)
-        return urdf_path
+        urdf_path = self.simulation_dir / filename
+        urdf_path.write_bytes(urdf_content.encode('utf-8'))
+        return str(urdf_path)
     
     def generate_from_onshape_files(self, gltf_path: str, stl_files: Dict[str, str] = None) -> Dict:
         """
@@ -0,0 +1,32 @@
+"""
+Ahead-of-time build of the simulation kernels
+
+Compiles the functions in kernels.py into the ctrlhub_kernels extension
+next to this file, which simulation_engine imports in preference to the
+JIT versions. Run from local_agent/ (setup.py does this before freezing):
+
+    python -m simulations._kernels_aot
+"""
+
+import os
+
+from numba.pycc import CC
+
+from simulations.kernels import rt_step, step_response_kernel, corr_rms_kernel
+
+cc = CC('ctrlhub_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Export the undecorated Python functions with fixed signatures
+cc.export('rt_step', 'UniTuple(f8, 2)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)')(rt_step.py_func)
+cc.export('step_response_kernel', 'Tuple((f8, i8, i8, i8, i8))(f8[:])')(step_response_kernel.py_func)
+cc.export('corr_rms_kernel', 'UniTuple(f8, 3)(f8[:], f8[:])')(corr_rms_kernel.py_func)
+
+
+def build():
+    """Compile the extension into this package directory"""
+    cc.compile()
+
+
+if __name__ == "__main__":
+    build()
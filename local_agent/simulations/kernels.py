@@ -0,0 +1,136 @@
+"""
+Numerical kernels for the simulation engine
+
+Numba-compiled when available (plain Python otherwise); _kernels_aot.py
+builds the same functions ahead of time into ctrlhub_kernels.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Run the decorated function as plain Python when Numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def step_response_kernel(output):
+    """
+    Scan a step response for its analysis indices in one pass
+
+    Returns (steady-state value, first index reaching 10% and 90% of it,
+    last index outside the 2% settling band, peak index); missing indices
+    are -1.
+    """
+    n = output.shape[0]
+    
+    # Steady-state value (average of last 10% of data)
+    steady_state_start = int(0.9 * n)
+    total = 0.0
+    for k in range(steady_state_start, n):
+        total += output[k]
+    steady_state = total / (n - steady_state_start)
+    
+    target_10 = 0.1 * steady_state
+    target_90 = 0.9 * steady_state
+    settling_tolerance = 0.02 * steady_state
+    
+    idx_10 = -1
+    idx_90 = -1
+    last_outside = -1
+    settles = False
+    peak = 0
+    for k in range(n):
+        value = output[k]
+        if idx_10 < 0 and value >= target_10:
+            idx_10 = k
+        if idx_90 < 0 and value >= target_90:
+            idx_90 = k
+        if abs(value - steady_state) <= settling_tolerance:
+            settles = True
+        else:
+            last_outside = k
+        if value > output[peak]:
+            peak = k
+    
+    # Settling time is only defined if the response ever enters the band
+    if not settles:
+        last_outside = -1
+    
+    return steady_state, idx_10, idx_90, last_outside, peak
+
+
+@njit(cache=True, fastmath=True)
+def rt_step(current, omega, voltage, load_torque, dt, R, L, Ke, Kt, J, b):
+    """
+    Advance the DC motor equations by dt; returns (current, angular velocity)
+
+    Classic RK4 on substeps no longer than a quarter of the electrical time
+    constant L/R, the stiff mode of the system, so arbitrary wall-clock dt
+    stays stable.
+    """
+    substeps = max(1, int(math.ceil(dt / (0.25 * L / R))))
+    h = dt / substeps
+    i = current
+    w = omega
+    for _ in range(substeps):
+        # L*di/dt = V - R*i - Ke*w ;  J*dw/dt = Kt*i - b*w - T_load
+        k1_i = (voltage - R * i - Ke * w) / L
+        k1_w = (Kt * i - b * w - load_torque) / J
+        i2 = i + 0.5 * h * k1_i
+        w2 = w + 0.5 * h * k1_w
+        k2_i = (voltage - R * i2 - Ke * w2) / L
+        k2_w = (Kt * i2 - b * w2 - load_torque) / J
+        i3 = i + 0.5 * h * k2_i
+        w3 = w + 0.5 * h * k2_w
+        k3_i = (voltage - R * i3 - Ke * w3) / L
+        k3_w = (Kt * i3 - b * w3 - load_torque) / J
+        i4 = i + h * k3_i
+        w4 = w + h * k3_w
+        k4_i = (voltage - R * i4 - Ke * w4) / L
+        k4_w = (Kt * i4 - b * w4 - load_torque) / J
+        i += h * (k1_i + 2.0 * k2_i + 2.0 * k3_i + k4_i) / 6.0
+        w += h * (k1_w + 2.0 * k2_w + 2.0 * k3_w + k4_w) / 6.0
+    return i, w
+
+
+@njit(cache=True)
+def corr_rms_kernel(hw, sim):
+    """Return (correlation, RMS error, hardware mean) of two equal-length series"""
+    n = hw.shape[0]
+    if n == 0:
+        # Nothing was captured; every metric is undefined
+        return np.nan, np.nan, np.nan
+    hw_mean = 0.0
+    sim_mean = 0.0
+    for k in range(n):
+        hw_mean += hw[k]
+        sim_mean += sim[k]
+    hw_mean /= n
+    sim_mean /= n
+    
+    cov = 0.0
+    hw_var = 0.0
+    sim_var = 0.0
+    sq_error = 0.0
+    for k in range(n):
+        hw_dev = hw[k] - hw_mean
+        sim_dev = sim[k] - sim_mean
+        cov += hw_dev * sim_dev
+        hw_var += hw_dev * hw_dev
+        sim_var += sim_dev * sim_dev
+        diff = hw[k] - sim[k]
+        sq_error += diff * diff
+    
+    # Undefined (NaN) for a constant series, as with np.corrcoef
+    denominator = np.sqrt(hw_var * sim_var)
+    correlation = cov / denominator if denominator > 0.0 else np.nan
+    return correlation, np.sqrt(sq_error / n), hw_mean
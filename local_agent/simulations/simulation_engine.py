@@ -4,18 +4,24 @@ Orchestrates real-time and offline simulations with educational focus
 """
 
 import asyncio
+import math
 import numpy as np
 import json
 import logging
-from typing import Dict, List, Any, Optional, Callable, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Callable, Tuple, Union
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 import time
 import threading
-from queue import Queue, Empty
 import sys
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -35,8 +41,28 @@ except ImportError as e:
         def __init__(self, *args, **kwargs):
             pass
 
+# Prefer the ahead-of-time build of the kernels (see _kernels_aot.py) to
+# skip JIT compilation on first use
+try:
+    from simulations.ctrlhub_kernels import rt_step, step_response_kernel, corr_rms_kernel
+    AOT_KERNELS = True
+except ImportError:
+    from simulations.kernels import rt_step, step_response_kernel, corr_rms_kernel
+    AOT_KERNELS = False
+
 logger = logging.getLogger(__name__)
 
+# Samples requested per GET_MOTOR_BURST round trip in hardware step responses
+HARDWARE_BURST_SIZE = 32
+
+# GET_MOTOR_BURST reply rows are (t, speed, current) with t in milliseconds
+# since the MOTOR_VOLTAGE step was applied; scale to seconds
+BURST_TIME_SCALE = 1e-3
+
+# Rows (time, input voltage, speed, current) buffered for get_real_time_data
+REALTIME_RING_SIZE = 4096
+
+
 class SimulationMode(Enum):
     """Simulation execution modes"""
     OFFLINE = "offline"          # Pure simulation, no hardware
@@ -44,9 +70,9 @@ class SimulationMode(Enum):
     HYBRID = "hybrid"           # Hardware-in-the-loop simulation
     VALIDATION = "validation"    # Compare simulation vs hardware
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SimulationConfig:
-    """Configuration for simulation runs"""
+    """Configuration for simulation runs (immutable, so its dict form is built once)"""
     mode: SimulationMode
     duration: float = 10.0           # Simulation duration (seconds)
     dt: float = 0.01                # Time step (seconds)
@@ -54,30 +80,39 @@ class SimulationConfig:
     auto_save: bool = True           # Auto-save results
     real_time: bool = False          # Real-time execution
     hardware_timeout: float = 1.0    # Hardware communication timeout
+    hardware_burst: bool = False     # Firmware implements GET_MOTOR_BURST
+    _as_dict: Dict[str, Any] = field(init=False, repr=False, compare=False)
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def __post_init__(self):
+        # cached_property needs __dict__, which slots removes; memoize in a slot
+        object.__setattr__(self, "_as_dict", {
             "mode": self.mode.value,
             "duration": self.duration,
             "dt": self.dt,
             "sample_rate": self.sample_rate,
             "auto_save": self.auto_save,
             "real_time": self.real_time,
-            "hardware_timeout": self.hardware_timeout
-        }
+            "hardware_timeout": self.hardware_timeout,
+            "hardware_burst": self.hardware_burst
+        })
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shared dict; treat as read-only"""
+        return self._as_dict
 
 @dataclass
 class SimulationResults:
-    """Container for simulation data and analysis"""
+    """Container for simulation data and analysis (one float64 array per channel)"""
     config: SimulationConfig
-    time_data: List[float]
-    input_data: List[float]          # Applied voltages
-    output_data: List[float]         # Measured/simulated speeds
-    current_data: List[float]        # Current measurements
+    time_data: np.ndarray
+    input_data: np.ndarray           # Applied voltages
+    output_data: np.ndarray          # Measured/simulated speeds
+    current_data: np.ndarray         # Current measurements
     metadata: Dict[str, Any]
     analysis: Optional[Dict[str, Any]] = None
     
-    def to_dict(self) -> Dict[str, Any]:
+    def _raw_dict(self) -> Dict[str, Any]:
+        """Same layout as to_dict, channels left as arrays"""
         return {
             "config": self.config.to_dict(),
             "time_data": self.time_data,
@@ -88,14 +123,56 @@ class SimulationResults:
             "analysis": self.analysis
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form; channels are converted to lists only here"""
+        data = self._raw_dict()
+        for key in ("time_data", "input_data", "output_data", "current_data"):
+            data[key] = data[key].tolist()
+        return data
+    
     def save_to_file(self, filepath: str):
-        """Save results to JSON file"""
+        """Save results to JSON file (orjson encodes the arrays directly when installed)"""
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.to_dict(), f, indent=2)
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(
+                    self._raw_dict(),
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+                )
+                with open(filepath, 'wb') as f:
+                    f.write(payload)
+            else:
+                with open(filepath, 'w') as f:
+                    json.dump(self.to_dict(), f, indent=2)
             logger.info(f"Simulation results saved to {filepath}")
         except Exception as e:
             logger.error(f"Failed to save results: {e}")
+    
+    async def save_to_file_async(self, filepath: str):
+        """save_to_file on a worker thread, for use from coroutines"""
+        await asyncio.to_thread(self.save_to_file, filepath)
+
+@dataclass(slots=True)
+class SampleFrame:
+    """
+    One streamed sample, reused across a run and mutated in place
+
+    Callbacks must not keep a reference past the call; use as_dict() for a
+    JSON-ready snapshot.
+    """
+    time: float = 0.0
+    voltage: float = 0.0
+    speed: float = 0.0
+    current: float = 0.0
+    mode: str = ""
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "time": self.time,
+            "voltage": self.voltage,
+            "speed": self.speed,
+            "current": self.current,
+            "mode": self.mode
+        }
 
 class SimulationEngine:
     """
@@ -104,21 +181,30 @@ class SimulationEngine:
     
     def __init__(self, motor_params: Optional[MotorParameters] = None):
         self.motor_model = DCMotorModel(motor_params) if motor_params else None
+        # Serialized parameters, rebuilt only when they change
+        self._params_dict = motor_params.to_dict() if motor_params else None
         self.arduino = None
         self.is_running = False
         self.current_results = None
         
         # Real-time simulation state
         self._sim_thread = None
-        self._data_queue = Queue()
+        # Single-producer/single-consumer ring: only the worker advances
+        # _ring_head and only get_real_time_data advances _ring_tail
+        self._ring = np.empty((REALTIME_RING_SIZE, 4), dtype=np.float64)
+        self._ring_head = 0
+        self._ring_tail = 0
+        self._ring_mode = ""
+        self._ring_constants = (0.0, 0.0)  # (Kt, Ke) of the streaming run
         self._stop_event = threading.Event()
         
-        # Callbacks for real-time data streaming
-        self.data_callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        # Callbacks for real-time data streaming (receive a dict or a SampleFrame)
+        self.data_callbacks: List[Callable[[Union[Dict[str, Any], SampleFrame]], None]] = []
     
     def set_motor_parameters(self, params: MotorParameters):
         """Update motor parameters and reinitialize model"""
         self.motor_model = DCMotorModel(params)
+        self._params_dict = params.to_dict()
         logger.info("Motor parameters updated")
     
     def connect_hardware(self, arduino_interface: ArduinoInterface) -> bool:
@@ -131,11 +217,16 @@ class SimulationEngine:
             logger.error(f"Hardware connection failed: {e}")
             return False
     
-    def add_data_callback(self, callback: Callable[[Dict[str, Any]], None]):
-        """Add callback for real-time data streaming"""
+    def add_data_callback(self, callback: Callable[[Union[Dict[str, Any], SampleFrame]], None]):
+        """
+        Add callback for real-time data streaming
+        
+        Hardware step responses pass a shared SampleFrame that is overwritten
+        on the next sample; call as_dict() to keep or serialize it.
+        """
         self.data_callbacks.append(callback)
     
-    def remove_data_callback(self, callback: Callable[[Dict[str, Any]], None]):
+    def remove_data_callback(self, callback: Callable[[Union[Dict[str, Any], SampleFrame]], None]):
         """Remove data callback"""
         if callback in self.data_callbacks:
             self.data_callbacks.remove(callback)
@@ -167,7 +258,7 @@ class SimulationEngine:
                     result = loop.run_until_complete(
                         self.run_step_response(config, step_voltage=voltage)
                     )
-                    return result
+                    return result.to_dict()
                 finally:
                     loop.close()
                     
@@ -183,7 +274,7 @@ class SimulationEngine:
                 "error": f"Simulation failed: {str(e)}"
             }
     
-    def _notify_callbacks(self, data: Dict[str, Any]):
+    def _notify_callbacks(self, data: Union[Dict[str, Any], SampleFrame]):
         """Notify all registered callbacks with new data"""
         for callback in self.data_callbacks:
             try:
@@ -213,37 +304,56 @@ class SimulationEngine:
         
         logger.info(f"Running offline step response: {step_voltage}V for {config.duration}s")
         
-        # Generate time vector
-        time_points = np.arange(0, config.duration, config.dt)
+        time_out, unit_response, unit_current = self._offline_unit_step(config)
+        return self._package_offline_step(config, step_voltage, time_out,
+                                          step_voltage * unit_response,
+                                          step_voltage * unit_current)
+    
+    def _offline_unit_step(self, config: SimulationConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Offline response to a 1 V step: (time, speed, current)
         
+        The model is LTI from rest, so any step voltage is a scaled copy.
+        """
         # Simulate step response using transfer function
         time_out, response = self.motor_model.simulate_step_response(
-            step_voltage, config.duration, config.dt
+            1.0, config.duration, config.dt
         )
         
-        # Generate current data (simplified)
+        current_data = self._simplified_current(1.0, time_out, config.dt)
+        
+        return time_out, np.asarray(response, dtype=np.float64), current_data
+    
+    def _simplified_current(self, voltage: float, time_data: np.ndarray, dt: float) -> np.ndarray:
+        """Current trace for offline runs: stall current V/R, then 1% decay per dt of elapsed time"""
         # In real scenario, we'd integrate the full state-space model
-        current_data = []
         self.motor_model.reset_state()
-        
-        for t in time_out:
-            if t < config.dt:  # Initial transient
-                state_data = self.motor_model.simulate_real_time(step_voltage, 0.0, config.dt)
-                current_data.append(state_data["current"])
-            else:
-                current_data.append(current_data[-1] * 0.99)  # Simplified decay
-        
-        # Package results
+        initial_current = voltage / self.motor_model.params.R
+        # Decay by elapsed time, so uneven (hardware) grids get the same curve
+        return initial_current * np.power(0.99, np.asarray(time_data, dtype=np.float64) / dt)
+    
+    def _run_step_offline_on_grid(self, config: SimulationConfig, step_voltage: float,
+                                  time_data: np.ndarray) -> SimulationResults:
+        """Offline step response evaluated at given (e.g. hardware) sample times"""
+        response = self.motor_model.step_response_at(step_voltage, time_data)
+        current_data = self._simplified_current(step_voltage, time_data, config.dt)
+        return self._package_offline_step(config, step_voltage, time_data,
+                                          response, current_data)
+    
+    def _package_offline_step(self, config: SimulationConfig, step_voltage: float,
+                              time_out: np.ndarray, response: np.ndarray,
+                              current_data: np.ndarray) -> SimulationResults:
+        """Wrap one offline step response in analysed SimulationResults"""
         results = SimulationResults(
             config=config,
-            time_data=time_out.tolist(),
-            input_data=[step_voltage] * len(time_out),
-            output_data=response.tolist(),
+            time_data=time_out,
+            input_data=np.full(len(time_out), step_voltage, dtype=np.float64),
+            output_data=response,
             current_data=current_data,
             metadata={
                 "test_type": "step_response",
                 "step_voltage": step_voltage,
-                "motor_parameters": self.motor_model.params.to_dict(),
+                "motor_parameters": self._params_dict,
                 "simulation_mode": "offline"
             }
         )
@@ -262,54 +372,94 @@ class SimulationEngine:
         
         logger.info(f"Running hardware step response: {step_voltage}V for {config.duration}s")
         
-        # Initialize data collection
-        time_data = []
-        input_data = []
-        output_data = []
-        current_data = []
+        # Initialize data collection: preallocated channels plus a write index
+        capacity = int(config.duration * config.sample_rate) + 16
+        time_data = np.empty(capacity, dtype=np.float64)
+        output_data = np.empty(capacity, dtype=np.float64)
+        current_data = np.empty(capacity, dtype=np.float64)
+        n = 0
+        
+        # One frame for every callback notification
+        frame = SampleFrame(voltage=step_voltage, mode="hardware")
         
-        start_time = time.time()
+        # Monotonic event-loop clock for the run deadline
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + config.duration
+        start_time = loop.time()
         sample_interval = 1.0 / config.sample_rate
-        last_sample_time = start_time
+        next_poll = start_time
+        # GET_MOTOR_BURST only when the config says the firmware supports it;
+        # otherwise one GET_MOTOR_DATA per sample
+        use_burst = config.hardware_burst
+        burst_seen = False
         
         try:
             # Apply step input
             await self.arduino.send_command("MOTOR_VOLTAGE", {"voltage": step_voltage})
             
             # Collect data
-            while (time.time() - start_time) < config.duration:
-                current_time = time.time()
-                
-                if (current_time - last_sample_time) >= sample_interval:
-                    # Read hardware data
-                    try:
-                        # Get motor data from Arduino
+            while n < capacity and loop.time() < end_time:
+                try:
+                    if not use_burst:
                         motor_data = await self.arduino.send_command("GET_MOTOR_DATA", {})
                         
                         if motor_data and "speed" in motor_data:
-                            time_data.append(current_time - start_time)
-                            input_data.append(step_voltage)
-                            output_data.append(motor_data["speed"])
-                            current_data.append(motor_data.get("current", 0.0))
+                            frame.time = time_data[n] = loop.time() - start_time
+                            frame.speed = output_data[n] = motor_data["speed"]
+                            frame.current = current_data[n] = motor_data.get("current", 0.0)
+                            n += 1
                             
                             # Real-time callback
-                            callback_data = {
-                                "time": current_time - start_time,
-                                "voltage": step_voltage,
-                                "speed": motor_data["speed"],
-                                "current": motor_data.get("current", 0.0),
-                                "mode": "hardware"
-                            }
-                            self._notify_callbacks(callback_data)
-                        
-                        last_sample_time = current_time
+                            self._notify_callbacks(frame)
                         
-                    except Exception as e:
-                        logger.warning(f"Data collection error: {e}")
-                
-                # Small delay to prevent overwhelming the system
-                if config.real_time:
-                    await asyncio.sleep(0.001)
+                        # Pace on the poll clock, so replies without a sample
+                        # still wait for the next interval
+                        next_poll = max(next_poll + sample_interval, loop.time())
+                        await asyncio.sleep(max(0.0, min(next_poll, end_time) - loop.time()))
+                        continue
+                    
+                    # The Arduino paces the samples, each round trip returns
+                    # up to HARDWARE_BURST_SIZE (t, speed, current) rows
+                    burst = await self.arduino.send_command(
+                        "GET_MOTOR_BURST",
+                        {"count": min(HARDWARE_BURST_SIZE, capacity - n),
+                         "interval": sample_interval}
+                    )
+                    samples = burst.get("samples") if burst else None
+                    if not samples:
+                        if not burst_seen:
+                            logger.info("GET_MOTOR_BURST unsupported, sampling with GET_MOTOR_DATA")
+                            use_burst = False
+                        else:
+                            await asyncio.sleep(max(0.0, min(sample_interval, end_time - loop.time())))
+                        continue
+                    
+                    block = np.asarray(samples, dtype=np.float64).reshape(-1, 3)
+                    k = min(len(block), capacity - n)
+                    burst_seen = True
+                    
+                    # Device times already count from the step command
+                    end = n + k
+                    time_data[n:end] = block[:k, 0] * BURST_TIME_SCALE
+                    output_data[n:end] = block[:k, 1]
+                    current_data[n:end] = block[:k, 2]
+                    
+                    # Real-time callbacks, one per sample
+                    if self.data_callbacks:
+                        for j in range(n, end):
+                            frame.time = float(time_data[j])
+                            frame.speed = float(output_data[j])
+                            frame.current = float(current_data[j])
+                            self._notify_callbacks(frame)
+                    
+                    n = end
+                    
+                except Exception as e:
+                    logger.warning(f"Data collection error: {e}")
+                    if not burst_seen:
+                        # Burst command rejected before any burst arrived
+                        use_burst = False
+                    await asyncio.sleep(max(0.0, min(sample_interval, end_time - loop.time())))
             
             # Stop motor
             await self.arduino.send_command("MOTOR_VOLTAGE", {"voltage": 0.0})
@@ -323,13 +473,13 @@ class SimulationEngine:
                 pass
             raise
         
-        # Package results
+        # Package results (input is the constant step voltage)
         results = SimulationResults(
             config=config,
-            time_data=time_data,
-            input_data=input_data,
-            output_data=output_data,
-            current_data=current_data,
+            time_data=time_data[:n].copy(),
+            input_data=np.full(n, step_voltage, dtype=np.float64),
+            output_data=output_data[:n].copy(),
+            current_data=current_data[:n].copy(),
             metadata={
                 "test_type": "step_response",
                 "step_voltage": step_voltage,
@@ -358,7 +508,10 @@ class SimulationEngine:
         # This would implement a more sophisticated HIL approach
         # For now, we'll run both and compare
         hardware_results = await self._run_step_hardware(config, step_voltage)
-        simulation_results = await self._run_step_offline(config, step_voltage)
+        # Simulate on the hardware sample times so the two line up one-to-one
+        simulation_results = self._run_step_offline_on_grid(
+            config, step_voltage, hardware_results.time_data
+        )
         
         # Combine results with comparison
         results = SimulationResults(
@@ -385,46 +538,34 @@ class SimulationEngine:
     def _analyze_step_response(self, results: SimulationResults) -> Dict[str, Any]:
         """Analyze step response characteristics"""
         try:
-            time_data = np.array(results.time_data)
-            output_data = np.array(results.output_data)
+            time_data = results.time_data
+            output_data = results.output_data
             
             if len(output_data) < 10:
                 return {"error": "Insufficient data for analysis"}
             
-            # Find steady-state value (average of last 10% of data)
-            steady_state_start = int(0.9 * len(output_data))
-            steady_state_value = np.mean(output_data[steady_state_start:])
+            # Flat trace (e.g. hardware disconnected): nothing to measure
+            if np.ptp(output_data) < 1e-9:
+                return {"steady_state_value": float(output_data.mean()), "note": "constant_signal"}
             
-            # Rise time (10% to 90% of steady-state)
-            target_10 = 0.1 * steady_state_value
-            target_90 = 0.9 * steady_state_value
-            
-            idx_10 = np.where(output_data >= target_10)[0]
-            idx_90 = np.where(output_data >= target_90)[0]
+            # Steady state, 10%/90% crossings, 2% band exit and peak in one scan
+            steady_state_value, idx_10, idx_90, last_outside, peak_index = \
+                step_response_kernel(output_data)
             
+            # Rise time (10% to 90% of steady-state)
             rise_time = None
-            if len(idx_10) > 0 and len(idx_90) > 0:
-                t_10 = time_data[idx_10[0]]
-                t_90 = time_data[idx_90[0]]
-                rise_time = t_90 - t_10
+            if idx_10 >= 0 and idx_90 >= 0:
+                rise_time = time_data[idx_90] - time_data[idx_10]
             
-            # Settling time (within 2% of steady-state)
-            settling_tolerance = 0.02 * steady_state_value
-            settling_mask = np.abs(output_data - steady_state_value) <= settling_tolerance
-            
-            settling_time = None
-            if np.any(settling_mask):
-                # Find the last time it was outside the tolerance
-                outside_tolerance = np.where(~settling_mask)[0]
-                if len(outside_tolerance) > 0:
-                    settling_time = time_data[outside_tolerance[-1]]
+            # Settling time (last time outside 2% of steady-state)
+            settling_time = time_data[last_outside] if last_outside >= 0 else None
             
             # Overshoot
-            max_value = np.max(output_data)
+            max_value = output_data[peak_index]
             overshoot_percent = ((max_value - steady_state_value) / steady_state_value * 100) if steady_state_value > 0 else 0
             
             # Peak time
-            peak_time = time_data[np.argmax(output_data)]
+            peak_time = time_data[peak_index]
             
             analysis = {
                 "steady_state_value": float(steady_state_value),
@@ -445,7 +586,7 @@ class SimulationEngine:
     
     def _analyze_hybrid_results(self, hardware_results: SimulationResults,
                                simulation_results: SimulationResults) -> Dict[str, Any]:
-        """Compare hardware and simulation results"""
+        """Compare hardware and simulation results sampled on the same time grid"""
         try:
             hw_analysis = hardware_results.analysis or {}
             sim_analysis = simulation_results.analysis or {}
@@ -467,28 +608,19 @@ class SimulationEngine:
                     }
             
             # Overall model accuracy
-            hw_output = np.array(hardware_results.output_data)
-            sim_output = np.array(simulation_results.output_data)
-            
-            # Interpolate simulation to match hardware time points if needed
-            if len(hw_output) != len(sim_output):
-                hw_time = np.array(hardware_results.time_data)
-                sim_time = np.array(simulation_results.time_data)
-                sim_output_interp = np.interp(hw_time, sim_time, sim_output)
-            else:
-                sim_output_interp = sim_output
+            hw_output = hardware_results.output_data
+            sim_output = simulation_results.output_data
             
-            # Calculate correlation and RMS error
-            correlation = np.corrcoef(hw_output, sim_output_interp[:len(hw_output)])[0, 1]
-            rms_error = np.sqrt(np.mean((hw_output - sim_output_interp[:len(hw_output)])**2))
+            # Calculate correlation and RMS error in one pass
+            correlation, rms_error, hw_mean = corr_rms_kernel(hw_output, sim_output)
             
             return {
                 "hardware_analysis": hw_analysis,
                 "simulation_analysis": sim_analysis,
                 "differences": differences,
                 "correlation": float(correlation) if not np.isnan(correlation) else None,
-                "rms_error": float(rms_error),
-                "model_accuracy_percent": float((1 - rms_error / np.mean(hw_output)) * 100) if np.mean(hw_output) > 0 else None
+                "rms_error": float(rms_error) if not np.isnan(rms_error) else None,
+                "model_accuracy_percent": float((1 - rms_error / hw_mean) * 100) if hw_mean > 0 else None
             }
             
         except Exception as e:
@@ -506,23 +638,28 @@ class SimulationEngine:
             # Simulate coast-down test
             coast_results = self.motor_model.coast_down_analysis(initial_speed=100.0)
             
-            # Simulate step response for different voltages
-            step_voltages = [6.0, 9.0, 12.0]
-            step_results = []
+            # Simulate step response for different voltages: one unit
+            # response, scaled per voltage (superposition)
+            step_voltages = np.array([6.0, 9.0, 12.0])
+            step_config = SimulationConfig(
+                mode=SimulationMode.OFFLINE,
+                duration=3.0,
+                dt=0.01
+            )
+            time_out, unit_response, unit_current = self._offline_unit_step(step_config)
+            outputs = unit_response[:, None] * step_voltages[None, :]
+            currents = unit_current[:, None] * step_voltages[None, :]
             
-            for voltage in step_voltages:
-                step_config = SimulationConfig(
-                    mode=SimulationMode.OFFLINE,
-                    duration=3.0,
-                    dt=0.01
-                )
-                step_result = await self._run_step_offline(step_config, voltage)
-                step_results.append(step_result.to_dict())
+            step_results = [
+                self._package_offline_step(step_config, float(voltage), time_out,
+                                           outputs[:, k].copy(), currents[:, k].copy()).to_dict()
+                for k, voltage in enumerate(step_voltages)
+            ]
             
             return {
                 "coast_down": coast_results,
                 "step_responses": step_results,
-                "identified_parameters": self.motor_model.params.to_dict(),
+                "identified_parameters": self._params_dict,
                 "system_characteristics": self.motor_model.calculate_system_characteristics()
             }
         
@@ -537,6 +674,10 @@ class SimulationEngine:
                                   input_function: Callable[[float], float]):
         """
         Start real-time simulation with custom input function
+        
+        input_function maps elapsed seconds to a voltage and is called once
+        per step on the worker thread; it may be a plain callable or an
+        @njit-compiled function, which skips the interpreter per call.
         """
         if self.is_running:
             raise RuntimeError("Simulation already running")
@@ -544,30 +685,59 @@ class SimulationEngine:
         self.is_running = True
         self._stop_event.clear()
         
+        # Fresh stream for this run
+        self._ring_head = self._ring_tail = 0
+        self._ring_mode = "simulation" if config.mode == SimulationMode.OFFLINE else "hardware"
+        if self.motor_model:
+            self._ring_constants = (self.motor_model.params.Kt, self.motor_model.params.Ke)
+        
         def simulation_worker():
             """Worker thread for real-time simulation"""
             try:
-                start_time = time.time()
+                # Bind everything the loop touches to locals
+                clock = time.monotonic
+                stop_requested = self._stop_event.is_set
+                ring = self._ring
+                ring_size = len(ring)
+                head = 0
+                notify = self._notify_callbacks
+                make_sample = self._simulation_sample
+                duration = config.duration
+                step_dt = config.dt
+                real_time = config.real_time
+                simulate_offline = config.mode == SimulationMode.OFFLINE and self.motor_model
+                use_hardware = config.mode == SimulationMode.HARDWARE and self.arduino
+                
+                if simulate_offline:
+                    # Plain floats for the compiled integrator
+                    params = self.motor_model.params
+                    R, L, J, b, Kt, Ke = params.R, params.L, params.J, params.b, params.Kt, params.Ke
+                    current, omega = (float(x) for x in self.motor_model.state)
+                    sim_time = float(self.motor_model.time)
+                
+                start_time = clock()
                 last_time = start_time
+                next_deadline = start_time
                 
-                while not self._stop_event.is_set():
-                    current_time = time.time()
+                while not stop_requested():
+                    current_time = clock()
                     elapsed = current_time - start_time
                     dt = current_time - last_time
                     
-                    if elapsed >= config.duration:
+                    if elapsed >= duration:
                         break
                     
                     # Get input from function
                     input_voltage = input_function(elapsed)
                     
-                    if config.mode == SimulationMode.OFFLINE and self.motor_model:
-                        # Pure simulation
-                        result = self.motor_model.simulate_real_time(input_voltage, 0.0, dt)
-                        result["mode"] = "simulation"
-                        result["input_voltage"] = input_voltage
+                    if simulate_offline:
+                        # Pure simulation (same fields as DCMotorModel.simulate_real_time)
+                        current, omega = rt_step(current, omega, input_voltage, 0.0, dt,
+                                                  R, L, Ke, Kt, J, b)
+                        sim_time += dt
+                        result = make_sample(current, omega, input_voltage, sim_time, Kt, Ke)
                         
-                    elif config.mode == SimulationMode.HARDWARE and self.arduino:
+                    elif use_hardware:
                         # Real hardware (simplified)
                         # In practice, this would be more complex
                         result = {
@@ -576,17 +746,31 @@ class SimulationEngine:
                             "mode": "hardware"
                         }
                     
-                    # Queue data for main thread
-                    self._data_queue.put(result)
+                    # Stream data for main thread; drop the sample if the
+                    # reader is a full ring behind
+                    if head - self._ring_tail < ring_size:
+                        if simulate_offline:
+                            ring[head % ring_size] = (sim_time, input_voltage, omega, current)
+                        else:
+                            ring[head % ring_size] = (elapsed, input_voltage, np.nan, np.nan)
+                        head += 1
+                        self._ring_head = head
                     
                     # Notify callbacks
-                    self._notify_callbacks(result)
+                    notify(result)
                     
                     last_time = current_time
                     
-                    # Real-time timing
-                    if config.real_time:
-                        time.sleep(max(0, config.dt - dt))
+                    # Real-time timing: sleep to the next step_dt boundary of the
+                    # run so the oversleep of one step does not carry forward
+                    if real_time:
+                        next_deadline += step_dt
+                        time.sleep(max(0.0, next_deadline - clock()))
+                
+                if simulate_offline:
+                    # Leave the model where the run ended
+                    self.motor_model.state = np.array([current, omega])
+                    self.motor_model.time = sim_time
                         
             except Exception as e:
                 logger.error(f"Real-time simulation error: {e}")
@@ -608,37 +792,72 @@ class SimulationEngine:
             logger.info("Real-time simulation stopped")
     
     def get_real_time_data(self) -> Optional[Dict[str, Any]]:
-        """Get latest real-time data (non-blocking)"""
-        try:
-            return self._data_queue.get_nowait()
-        except Empty:
+        """
+        Get next real-time sample (non-blocking)
+        
+        Returns the same dict the callbacks received for that step, rebuilt
+        from the buffered row, or None when the stream is drained.
+        """
+        tail = self._ring_tail
+        if tail == self._ring_head:
             return None
+        
+        sample_time, input_voltage, omega, current = self._ring[tail % len(self._ring)].tolist()
+        self._ring_tail = tail + 1
+        if self._ring_mode == "hardware":
+            return {
+                "time": sample_time,
+                "input_voltage": input_voltage,
+                "mode": "hardware"
+            }
+        Kt, Ke = self._ring_constants
+        return self._simulation_sample(current, omega, input_voltage, sample_time, Kt, Ke)
+    
+    @staticmethod
+    def _simulation_sample(current: float, omega: float, input_voltage: float,
+                           timestamp: float, Kt: float, Ke: float) -> Dict[str, Any]:
+        """Real-time simulation sample (same fields as DCMotorModel.simulate_real_time)"""
+        torque = Kt * current
+        power_input = input_voltage * current
+        power_mechanical = torque * omega
+        return {
+            "current": current,
+            "angular_velocity": omega,
+            "rpm": omega * 60 / (2 * math.pi),
+            "torque": torque,
+            "back_emf": Ke * omega,
+            "power_input": power_input,
+            "power_mechanical": power_mechanical,
+            "efficiency": (power_mechanical / power_input * 100) if power_input > 0 else 0.0,
+            "timestamp": timestamp,
+            "mode": "simulation",
+            "input_voltage": input_voltage
+        }
     
     def export_results_csv(self, results: SimulationResults, filepath: str):
         """Export results to CSV format"""
         try:
-            import csv
+            n = len(results.time_data)
             
-            with open(filepath, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Header
-                writer.writerow(['Time', 'Input_Voltage', 'Output_Speed', 'Current'])
-                
-                # Data
-                for i in range(len(results.time_data)):
-                    writer.writerow([
-                        results.time_data[i],
-                        results.input_data[i],
-                        results.output_data[i],
-                        results.current_data[i] if i < len(results.current_data) else 0
-                    ])
+            # Current may be shorter than the other channels; pad with zeros
+            current = np.zeros(n, dtype=np.float64)
+            m = min(n, len(results.current_data))
+            current[:m] = results.current_data[:m]
+            
+            data = np.column_stack((results.time_data, results.input_data[:n],
+                                    results.output_data[:n], current))
+            np.savetxt(filepath, data, delimiter=',', fmt='%.10g', comments='',
+                       header='Time,Input_Voltage,Output_Speed,Current')
             
             logger.info(f"Results exported to CSV: {filepath}")
             
         except Exception as e:
             logger.error(f"CSV export failed: {e}")
     
+    async def export_results_csv_async(self, results: SimulationResults, filepath: str):
+        """export_results_csv on a worker thread, for use from coroutines"""
+        await asyncio.to_thread(self.export_results_csv, results, filepath)
+    
     def cleanup(self):
         """Clean up resources"""
         self.stop_real_time_simulation()
@@ -1,10 +1,28 @@
 from cx_Freeze import setup, Executable
+import os
 import sys
 
+
+def build_aot_kernels():
+    """Compile the Numba kernels ahead of time so the agent skips JIT at startup"""
+    agent_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_agent")
+    sys.path.insert(0, agent_dir)
+    try:
+        from simulations._kernels_aot import build
+    except ImportError as e:
+        print(f"Skipping AOT kernels, falling back to JIT: {e}")
+        return
+    build()
+
+
+if any(command.startswith("build") for command in sys.argv[1:]):
+    # The extension lands in local_agent/simulations/, bundled below
+    build_aot_kernels()
+
 build_exe_options = {
+    # Third-party only; stdlib modules are found by import tracing
     "packages": [
-        "fastapi", "uvicorn", "serial", "numpy", "scipy", "control",
-        "tkinter", "asyncio", "json", "logging", "threading"
+        "fastapi", "uvicorn", "serial", "numpy", "scipy", "control"
     ],
     "include_files": [
         ("local_agent/models/", "models/"),
@@ -12,7 +30,15 @@ build_exe_options = {
         ("local_agent/simulations/", "simulations/"),
         ("local_agent/controllers/", "controllers/")
     ],
-    "excludes": ["matplotlib", "pandas"]  # Exclude heavy packages not needed
+    # Exclude heavy packages and test suites not needed at runtime
+    "excludes": [
+        "matplotlib", "pandas", "pytest",
+        "numpy.tests", "scipy.tests", "scipy.sparse.tests", "tkinter.test"
+    ],
+    "optimize": 2,
+    "zip_include_packages": ["*"],  # Compressed bytecode, fewer files to open at startup
+    # Packages that load data files or extension modules relative to __file__
+    "zip_exclude_packages": ["numpy", "scipy", "control"]
 }
 
 base = None
@@ -3,31 +3,37 @@
 Test CtrlHub Local Agent API
 """
 
-import urllib.request
-import json
+import requests
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads  # Also accepts bytes
+
+BASE_URL = "http://localhost:8001"
+
+# (label, path) for each endpoint probed
+ENDPOINTS = (
+    ("Main endpoint", "/"),
+    ("Status endpoint", "/status"),
+    ("Hardware scan", "/hardware/scan"),
+)
 
 def test_api():
     try:
-        # Test main endpoint
         print("🧪 Testing CtrlHub Local Agent API")
         print("=" * 40)
-        
-        response = urllib.request.urlopen('http://localhost:8001/')
-        data = json.loads(response.read().decode())
-        print("✅ Main endpoint:", data)
-        
-        # Test status endpoint
-        response = urllib.request.urlopen('http://localhost:8001/status')
-        data = json.loads(response.read().decode())
-        print("✅ Status endpoint:", data)
-        
-        # Test hardware scan
-        response = urllib.request.urlopen('http://localhost:8001/hardware/scan')
-        data = json.loads(response.read().decode())
-        print("✅ Hardware scan:", data)
-        
+
+        # One keep-alive connection for all endpoints
+        with requests.Session() as session:
+            for label, path in ENDPOINTS:
+                response = session.get(BASE_URL + path, timeout=2.0)
+                response.raise_for_status()
+                # Parse the raw body bytes, no intermediate str decode
+                print(f"✅ {label}:", json_loads(response.content))
+
         print("\n🎉 All API tests passed!")
-        
+
     except Exception as e:
         print(f"❌ API test failed: {e}")
 